@@ -1,4 +1,4 @@
 set -e
 
-pybabel extract --input-dirs=src/bot/ -o src/bot/locales/messages.pot
+pybabel extract -k get_i18n_text --input-dirs=src/bot/ -o src/bot/locales/messages.pot
 pybabel update -d src/bot/locales -D messages -i src/bot/locales/messages.pot
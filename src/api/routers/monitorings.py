@@ -1,3 +1,4 @@
+from datetime import timedelta
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -5,18 +6,38 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
 from database import DatabaseProvider, get_database_dep
-from database.enums import MonitoringRunStatus
-from database.models import Advert, Marketplace, Monitoring, MonitoringRun
+from database.models import Advert, Marketplace, Monitoring, MonitoringRun, User
 from database.schemas import (
     MonitoringCreate,
     MonitoringDetailsRead,
     MonitoringRead,
     MonitoringUpdate,
+    UserRead,
 )
+from settings import ApiSettings
 
 router = APIRouter(prefix="/monitorings")
 
 
+async def validate_run_interval(database: DatabaseProvider, run_interval: timedelta, user_id: int) -> None:
+    """Validates that the run interval is not shorter than allowed for the user.
+
+    Args:
+        database (DatabaseProvider): Provider for the database.
+        run_interval (timedelta): Run interval to validate.
+        user_id (int): ID of the user the monitoring belongs to.
+
+    Raises:
+        HTTPException (400): If the run interval is too short.
+
+    """
+    api_settings = ApiSettings()
+    user = await database.get(model=User, filters=[User.id == user_id], read_schema=UserRead)
+    min_run_interval = api_settings.premium_min_run_interval if user and user.premium else api_settings.min_run_interval
+    if run_interval < timedelta(seconds=min_run_interval):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Run interval is too short")
+
+
 @router.get("/")
 async def read_monitorings(
     database: Annotated[DatabaseProvider, Depends(get_database_dep)], user_id: int | None = None
@@ -81,14 +102,16 @@ async def read_monitoring_details(
             Monitoring.url,
             Monitoring.run_interval,
             Monitoring.enabled,
+            Monitoring.adaptive_interval,
+            Monitoring.effective_run_interval,
+            Monitoring.next_run_at,
+            Monitoring.last_run_at,
+            Monitoring.last_success_at,
+            Monitoring.consecutive_failures,
             Monitoring.created_at,
             Monitoring.updated_at,
             Marketplace.name.label("marketplace_name"),
-            select(MonitoringRun.created_at)
-            .where(MonitoringRun.monitoring_id == monitoring_id, MonitoringRun.status == MonitoringRunStatus.SUCCESS)
-            .order_by(MonitoringRun.created_at.desc())
-            .limit(1)
-            .label("last_successful_run"),
+            Monitoring.last_success_at.label("last_successful_run"),
         )
         .where(Monitoring.id == monitoring_id)
         .join(Marketplace, Marketplace.id == Monitoring.marketplace_id)
@@ -112,6 +135,8 @@ async def create_monitoring(
         database (DatabaseProvider): Provider for the database.
 
     Raises:
+        HTTPException (400): If the run interval is too short.
+        HTTPException (403): If the user has reached the limit of monitorings.
         HTTPException (409): If the monitoring already exists.
         HTTPException (404): If the user or marketplace is not found.
 
@@ -119,6 +144,11 @@ async def create_monitoring(
         MonitoringRead: Created monitoring.
 
     """
+    await validate_run_interval(database, monitoring.run_interval, monitoring.user_id)
+    user_monitorings = await database.count(model=Monitoring, filters=[Monitoring.user_id == monitoring.user_id])
+    if user_monitorings >= ApiSettings().max_monitorings_per_user:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Monitorings limit reached")
+
     try:
         return await database.create(model=Monitoring, data=monitoring, read_schema=MonitoringRead)
     except IntegrityError as error:
@@ -146,12 +176,20 @@ async def update_monitoring(
         database (DatabaseProvider): Provider for the database.
 
     Raises:
+        HTTPException (400): If the run interval is too short.
         HTTPException (404): If the monitoring is not found.
 
     Returns:
         MonitoringRead: Updated monitoring.
 
     """
+    if monitoring.run_interval is not None:
+        current_monitoring = await database.get(
+            model=Monitoring, filters=[Monitoring.id == monitoring_id], read_schema=MonitoringRead
+        )
+        if current_monitoring is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Monitoring not found")
+        await validate_run_interval(database, monitoring.run_interval, current_monitoring.user_id)
     try:
         return await database.update(
             model=Monitoring, data=monitoring, read_schema=MonitoringRead, filters=[Monitoring.id == monitoring_id]
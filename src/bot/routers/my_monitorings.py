@@ -26,7 +26,12 @@ from bot.utils.validators import (
     validate_monitoring_url,
     validate_state_context_value,
 )
-from database.schemas import MonitoringDetailsRead, MonitoringRead, MonitoringUpdate
+from database.schemas import (
+    MonitoringDetailsRead,
+    MonitoringRead,
+    MonitoringUpdate,
+    UserRead,
+)
 
 router = Router(name="my_monitorings")
 
@@ -48,6 +53,13 @@ class MyMonitoringsUpdateEnabledCD(CallbackData, prefix="my_monitorings_update_e
     enabled: bool
 
 
+class MyMonitoringsUpdateAdaptiveIntervalCD(CallbackData, prefix="my_monitorings_update_adaptive_interval"):
+    """Callback data for updating monitoring adaptive interval."""
+
+    monitoring_id: int
+    adaptive_interval: bool
+
+
 class MyMonitoringsDeleteCD(CallbackData, prefix="my_monitorings_delete"):
     """Callback data for deleting monitoring."""
 
@@ -135,6 +147,27 @@ async def show_monitoring_details(
         if monitoring_details.last_successful_run
         else get_i18n_text("Never")
     )
+    last_run_text = f"{get_i18n_text("Last run")}: {hbold(last_run)}"
+    if monitoring_details.consecutive_failures:
+        last_run_text = join_text(
+            last_run_text,
+            f"{get_i18n_text("Failed runs in a row")}: {hbold(monitoring_details.consecutive_failures)}",
+            sep="\n",
+        )
+
+    if monitoring_details.adaptive_interval:
+        effective_run_interval = monitoring_details.effective_run_interval or monitoring_details.run_interval
+        run_interval_text = join_text(
+            f"{get_i18n_text("Run interval")}: {hbold(get_readable_timedelta(monitoring_details.run_interval))}",
+            f"{get_i18n_text("Effective run interval")}: {hbold(get_readable_timedelta(effective_run_interval))}",
+            sep="\n",
+        )
+        change_adaptive_interval_button_text = get_i18n_text("⏱ Disable adaptive interval")
+    else:
+        run_interval_text = (
+            f"{get_i18n_text("Run interval")}: {hbold(get_readable_timedelta(monitoring_details.run_interval))}"
+        )
+        change_adaptive_interval_button_text = get_i18n_text("⏱ Enable adaptive interval")
 
     keyboard_builder = InlineKeyboardBuilder()
     keyboard_builder.button(
@@ -144,6 +177,13 @@ async def show_monitoring_details(
             enabled=change_status_button_enabled_value,
         ),
     )
+    keyboard_builder.button(
+        text=change_adaptive_interval_button_text,
+        callback_data=MyMonitoringsUpdateAdaptiveIntervalCD(
+            monitoring_id=callback_data.monitoring_id,
+            adaptive_interval=not monitoring_details.adaptive_interval,
+        ),
+    )
     keyboard_builder.button(
         text=get_i18n_text("📝 Edit"), callback_data=MyMonitoringsUpdateCD(monitoring_id=callback_data.monitoring_id)
     )
@@ -158,8 +198,8 @@ async def show_monitoring_details(
             f"{get_i18n_text("Monitoring")}: {hbold(monitoring_details.name)}",
             f"{get_i18n_text("Status")}: {hbold(status)}",
             f"{get_i18n_text("URL")}: {hlink(monitoring_details.marketplace_name, monitoring_details.url)}",
-            f"{get_i18n_text("Run interval")}: {hbold(get_readable_timedelta(monitoring_details.run_interval))}",
-            f"{get_i18n_text("Last run")}: {hbold(last_run)}",
+            run_interval_text,
+            last_run_text,
             sep="\n",
         ),
         parse_mode="HTML",
@@ -188,6 +228,26 @@ async def update_monitoring_enabled(
     await show_monitoring_details(callback, api, MyMonitoringsDetailsCD(monitoring_id=callback_data.monitoring_id))
 
 
+@router.callback_query(MyMonitoringsUpdateAdaptiveIntervalCD.filter())
+async def update_monitoring_adaptive_interval(
+    callback: CallbackQuery, api: ApiProvider, callback_data: MyMonitoringsUpdateAdaptiveIntervalCD
+) -> None:
+    """Updates monitoring adaptive interval.
+
+    Args:
+        callback (CallbackQuery): CallbackQuery object.
+        api (ApiProvider): Provider for the API.
+        callback_data (MyMonitoringsUpdateAdaptiveIntervalCD): Callback data.
+
+    """
+    await api.request(
+        "PATCH",
+        f"/monitorings/{callback_data.monitoring_id}",
+        json_data=MonitoringUpdate(adaptive_interval=callback_data.adaptive_interval),
+    )
+    await show_monitoring_details(callback, api, MyMonitoringsDetailsCD(monitoring_id=callback_data.monitoring_id))
+
+
 @router.callback_query(MyMonitoringsDeleteCD.filter(F.confirmed == False))  # noqa: E712  # pylint: disable=C0121
 async def confirm_monitoring_deletion(callback: CallbackQuery, callback_data: MyMonitoringsDeleteCD) -> None:
     """Confirms monitoring deletion.
@@ -261,7 +321,7 @@ async def show_update_fields(callback: CallbackQuery, callback_data: MyMonitorin
 
 @router.callback_query(MyMonitoringsUpdateCD.filter(F.field != None))  # noqa: E711  # pylint: disable=C0121
 async def enter_new_field_value(
-    callback: CallbackQuery, callback_data: MyMonitoringsUpdateCD, state: FSMContext
+    callback: CallbackQuery, callback_data: MyMonitoringsUpdateCD, state: FSMContext, user: UserRead | None
 ) -> None:
     """Enters new field value.
 
@@ -269,6 +329,7 @@ async def enter_new_field_value(
         callback (CallbackQuery): CallbackQuery object.
         callback_data (MyMonitoringsUpdateCD): Callback data.
         state (FSMContext): State context.
+        user (UserRead | None): Current user.
 
     """
     message = validate_callback_message(callback)
@@ -283,7 +344,7 @@ async def enter_new_field_value(
         new_state = MyMonitoringUpdateState.enter_url
     else:
         text = get_i18n_text("Choose new run interval for the monitoring:")
-        reply_markup = get_run_intervals_keyboard()
+        reply_markup = get_run_intervals_keyboard(premium=user is not None and user.premium)
         new_state = MyMonitoringUpdateState.choose_run_interval
 
     await state.update_data(monitoring_id=callback_data.monitoring_id)
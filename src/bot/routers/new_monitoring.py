@@ -14,7 +14,7 @@ from bot.utils.validators import (
     validate_monitoring_name,
     validate_monitoring_url,
 )
-from database.schemas import MonitoringCreate
+from database.schemas import MonitoringCreate, UserRead
 
 router = Router(name="new_monitoring")
 
@@ -60,18 +60,22 @@ async def enter_url(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.message(NewMonitoringState.enter_url)
-async def choose_run_interval(message: Message, state: FSMContext) -> None:
+async def choose_run_interval(message: Message, state: FSMContext, user: UserRead | None) -> None:
     """Saves the monitoring URL and asks user to choose monitoring run interval.
 
     Args:
         message (Message): Message object.
         state (FSMContext): State context.
+        user (UserRead | None): Current user.
 
     """
     url = validate_monitoring_url(message.text)
     await state.update_data(url=url)
     await state.set_state(NewMonitoringState.choose_run_interval)
-    await message.answer(get_i18n_text("Choose monitoring run interval:"), reply_markup=get_run_intervals_keyboard())
+    await message.answer(
+        get_i18n_text("Choose monitoring run interval:"),
+        reply_markup=get_run_intervals_keyboard(premium=user is not None and user.premium),
+    )
 
 
 @router.callback_query(NewMonitoringState.choose_run_interval)
@@ -114,7 +118,10 @@ async def create_monitoring(message: Message, api: ApiProvider, state: FSMContex
         "POST",
         "/monitorings/",
         json_data=monitoring,
-        custom_error_messages={409: get_i18n_text("Monitoring with this url already exists.")},
+        custom_error_messages={
+            403: get_i18n_text("You have reached the limit of monitorings."),
+            409: get_i18n_text("Monitoring with this url already exists."),
+        },
     )
     await message.answer(
         get_i18n_text(
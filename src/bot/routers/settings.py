@@ -1,3 +1,5 @@
+from datetime import time
+
 from aiogram import Router
 from aiogram.exceptions import DetailedAiogramError
 from aiogram.filters import Command
@@ -16,6 +18,8 @@ from database.schemas import UserRead, UserUpdate
 
 router = Router(name="settings")
 
+QUIET_HOURS_OPTIONS = [(22, 7), (23, 7), (23, 8), (0, 8)]
+
 
 class SettingsListCD(CallbackData, prefix="settings_list"):
     """Callback data for the settings list."""
@@ -31,6 +35,29 @@ class SettingsUpdateLanguageCD(CallbackData, prefix="settings_update_language"):
     language: UserLanguage
 
 
+class SettingsChooseQuietHoursCD(CallbackData, prefix="settings_choose_quiet_hours"):
+    """Callback data for choosing the quiet hours."""
+
+
+class SettingsUpdateQuietHoursCD(CallbackData, prefix="settings_update_quiet_hours"):
+    """Callback data for updating the quiet hours."""
+
+    enabled: bool
+    start_hour: int = 0
+    end_hour: int = 0
+
+
+def get_readable_quiet_hours(start: time, end: time) -> str:
+    """Returns readable quiet hours.
+
+    Args:
+        start (time): Start of quiet hours.
+        end (time): End of quiet hours.
+
+    """
+    return f"{start:%H:%M}–{end:%H:%M}"
+
+
 @router.message(Command("settings"))
 @router.callback_query(SettingsListCD.filter())
 async def show_settings(event: Message | CallbackQuery, user: UserRead | None) -> None:
@@ -60,6 +87,16 @@ async def show_settings(event: Message | CallbackQuery, user: UserRead | None) -
         ),
         callback_data=SettingsChooseLanguageCD(),
     )
+    if user.quiet_hours_enabled:
+        current_quiet_hours = get_readable_quiet_hours(user.quiet_hours_start, user.quiet_hours_end)
+    else:
+        current_quiet_hours = get_i18n_text("Off", locale=user.language)
+    keyboard_builder.button(
+        text=get_i18n_text("Quiet hours (current: {current_quiet_hours})", locale=user.language).format(
+            current_quiet_hours=current_quiet_hours
+        ),
+        callback_data=SettingsChooseQuietHoursCD(),
+    )
     keyboard_builder.adjust(1)
     await answer_method(
         get_i18n_text("Here are the settings:", locale=user.language), reply_markup=keyboard_builder.as_markup()
@@ -110,3 +147,51 @@ async def update_language(callback: CallbackQuery, callback_data: SettingsUpdate
         response_model=UserRead,
     )
     await show_settings(callback, user)
+
+
+@router.callback_query(SettingsChooseQuietHoursCD.filter())
+async def choose_quiet_hours(callback: CallbackQuery) -> None:
+    """Asks user to choose the quiet hours.
+
+    Args:
+        callback (CallbackQuery): CallbackQuery object.
+
+    """
+    message = validate_callback_message(callback)
+    keyboard_builder = InlineKeyboardBuilder()
+    keyboard_builder.button(text=get_i18n_text("Off"), callback_data=SettingsUpdateQuietHoursCD(enabled=False))
+    for start_hour, end_hour in QUIET_HOURS_OPTIONS:
+        keyboard_builder.button(
+            text=get_readable_quiet_hours(time(start_hour), time(end_hour)),
+            callback_data=SettingsUpdateQuietHoursCD(enabled=True, start_hour=start_hour, end_hour=end_hour),
+        )
+    keyboard_builder.button(text=get_i18n_text("<-- Back to settings"), callback_data=SettingsListCD())
+    keyboard_builder.adjust(1)
+    await message.edit_text(
+        get_i18n_text("Choose quiet hours (Kyiv time). Monitorings are not run during quiet hours:"),
+        reply_markup=keyboard_builder.as_markup(),
+    )
+
+
+@router.callback_query(SettingsUpdateQuietHoursCD.filter())
+async def update_quiet_hours(
+    callback: CallbackQuery, callback_data: SettingsUpdateQuietHoursCD, api: ApiProvider
+) -> None:
+    """Updates the quiet hours.
+
+    Args:
+        callback (CallbackQuery): CallbackQuery object.
+        callback_data (SettingsUpdateQuietHoursCD): Callback data.
+        api (ApiProvider): Provider for the API.
+
+    """
+    if callback_data.enabled:
+        user_update = UserUpdate(
+            quiet_hours_enabled=True,
+            quiet_hours_start=time(callback_data.start_hour),
+            quiet_hours_end=time(callback_data.end_hour),
+        )
+    else:
+        user_update = UserUpdate(quiet_hours_enabled=False)
+    user = await api.request("PATCH", f"/users/{callback.from_user.id}", json_data=user_update, response_model=UserRead)
+    await show_settings(callback, user)
@@ -6,6 +6,7 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder, InlineKeyboardMarkup
 from bot.middlewares import ApiProvider
 from bot.utils.time import get_readable_timedelta
 from database.schemas import MarketplaceRead
+from settings import ApiSettings
 
 
 async def get_marketplaces_keyboard(api: ApiProvider, provide_id: bool, provide_url: bool) -> InlineKeyboardMarkup:
@@ -32,10 +33,21 @@ async def get_marketplaces_keyboard(api: ApiProvider, provide_id: bool, provide_
     return keyboard_builder.as_markup()
 
 
-def get_run_intervals_keyboard() -> InlineKeyboardMarkup:
-    """Returns a keyboard with available run intervals."""
+def get_run_intervals_keyboard(premium: bool) -> InlineKeyboardMarkup:
+    """Returns a keyboard with run intervals allowed by the API.
+
+    Args:
+        premium (bool): Whether the user is premium, premium users can choose shorter intervals.
+
+    """
+    api_settings = ApiSettings()
+    min_run_interval = timedelta(
+        seconds=api_settings.premium_min_run_interval if premium else api_settings.min_run_interval
+    )
     keyboard_builder = InlineKeyboardBuilder()
     for td in [
+        timedelta(minutes=1),
+        timedelta(minutes=2),
         timedelta(minutes=5),
         timedelta(minutes=10),
         timedelta(minutes=15),
@@ -47,6 +59,8 @@ def get_run_intervals_keyboard() -> InlineKeyboardMarkup:
         timedelta(hours=12),
         timedelta(hours=24),
     ]:
+        if td < min_run_interval:
+            continue
         keyboard_builder.button(text=get_readable_timedelta(td), callback_data=str(td.total_seconds()))
     keyboard_builder.adjust(3)
     return keyboard_builder.as_markup()
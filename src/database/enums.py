@@ -25,4 +25,6 @@ class MonitoringRunStatus(DatabaseEnum):
     QUEUED = "queued"
     RUNNING = "running"
     SUCCESS = "success"
+    PARTIAL = "partial"
+    TIMEOUT = "timeout"
     FAILED = "failed"
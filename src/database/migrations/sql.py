@@ -23,3 +23,108 @@ for each row execute procedure public.refresh_updated_at()
 DROP_UPDATED_AT_TRIGGER_SQL = """
 drop trigger trig_{table}_updated_at on public.{table}
 """
+
+CREATE_REFRESH_NEXT_RUN_AT_FUNC_SQL = """
+create function public.refresh_next_run_at()
+    returns trigger
+    language plpgsql as
+    $func$
+    begin
+        if new.next_run_at is not null and new.run_interval <> old.run_interval then
+            new.next_run_at := coalesce(new.last_run_at + new.run_interval, now());
+        end if;
+        return new;
+    end
+    $func$
+"""
+
+DROP_REFRESH_NEXT_RUN_AT_FUNC_SQL = """
+drop function public.refresh_next_run_at() cascade
+"""
+
+CREATE_NEXT_RUN_AT_TRIGGER_SQL = """
+create trigger trig_monitorings_next_run_at
+before update on public.monitorings
+for each row execute procedure public.refresh_next_run_at()
+"""
+
+BACKFILL_MONITORINGS_SCHEDULE_SQL = """
+update monitorings
+set
+    last_run_at = runs.last_run_at,
+    last_success_at = runs.last_success_at,
+    next_run_at = case when runs.in_progress then null else runs.last_run_at + monitorings.run_interval end
+from (
+    select
+        monitoring_id,
+        max(created_at) as last_run_at,
+        max(created_at) filter (where status = 'success') as last_success_at,
+        bool_or(status not in ('success', 'failed')) as in_progress
+    from monitoring_runs
+    group by monitoring_id
+) as runs
+where monitorings.id = runs.monitoring_id
+"""
+
+CREATE_NOTIFY_MONITORING_CHANGED_FUNC_SQL = """
+create function public.notify_monitoring_changed()
+    returns trigger
+    language plpgsql as
+    $func$
+    begin
+        if tg_op = 'DELETE' then
+            perform pg_notify(
+                'monitorings_changed', json_build_object('id', old.id, 'enabled', false, 'next_run_at', null)::text
+            );
+            return old;
+        end if;
+        if tg_op = 'UPDATE' and new.enabled = old.enabled and new.next_run_at is not distinct from old.next_run_at then
+            return new;
+        end if;
+        perform pg_notify(
+            'monitorings_changed',
+            json_build_object('id', new.id, 'enabled', new.enabled, 'next_run_at', new.next_run_at)::text
+        );
+        return new;
+    end
+    $func$
+"""
+
+DROP_NOTIFY_MONITORING_CHANGED_FUNC_SQL = """
+drop function public.notify_monitoring_changed() cascade
+"""
+
+CREATE_MONITORING_CHANGED_TRIGGER_SQL = """
+create trigger trig_monitorings_changed
+after insert or update or delete on public.monitorings
+for each row execute procedure public.notify_monitoring_changed()
+"""
+
+CREATE_NOTIFY_MONITORING_RUN_SCHEDULED_FUNC_SQL = """
+create function public.notify_monitoring_run_scheduled()
+    returns trigger
+    language plpgsql as
+    $func$
+    begin
+        perform pg_notify(
+            'monitorings_changed',
+            json_build_object('id', new.monitoring_id, 'enabled', true, 'next_run_at', now())::text
+        );
+        return new;
+    end
+    $func$
+"""
+
+DROP_NOTIFY_MONITORING_RUN_SCHEDULED_FUNC_SQL = """
+drop function public.notify_monitoring_run_scheduled() cascade
+"""
+
+CREATE_MONITORING_RUN_SCHEDULED_TRIGGER_SQL = """
+create trigger trig_monitoring_runs_scheduled
+after insert on public.monitoring_runs
+for each row when (new.status = 'scheduled') execute procedure public.notify_monitoring_run_scheduled()
+"""
+
+BACKFILL_ADVERTS_FIRST_MONITORING_RUN_ID_SQL = """
+update public.adverts set first_monitoring_run_id = monitoring_run_id
+"""
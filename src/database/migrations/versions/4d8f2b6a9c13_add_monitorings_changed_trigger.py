@@ -0,0 +1,36 @@
+"""Adds trigger notifying about changed monitorings.
+
+Revision ID: 4d8f2b6a9c13
+Revises: 9a4c6e1f7b20
+Create Date: 2026-10-18 16:48:03.571264
+
+"""
+
+# pylint: disable=C0103
+
+from typing import Sequence
+
+from alembic import op
+
+from database.migrations.sql import (
+    CREATE_MONITORING_CHANGED_TRIGGER_SQL,
+    CREATE_NOTIFY_MONITORING_CHANGED_FUNC_SQL,
+    DROP_NOTIFY_MONITORING_CHANGED_FUNC_SQL,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "4d8f2b6a9c13"
+down_revision: str | None = "9a4c6e1f7b20"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrades database."""
+    op.execute(CREATE_NOTIFY_MONITORING_CHANGED_FUNC_SQL)
+    op.execute(CREATE_MONITORING_CHANGED_TRIGGER_SQL)
+
+
+def downgrade() -> None:
+    """Downgrades database."""
+    op.execute(DROP_NOTIFY_MONITORING_CHANGED_FUNC_SQL)
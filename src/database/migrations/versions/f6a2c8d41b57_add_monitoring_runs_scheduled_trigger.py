@@ -0,0 +1,36 @@
+"""Adds trigger notifying about scheduled monitoring runs.
+
+Revision ID: f6a2c8d41b57
+Revises: b3f9d4e6a172
+Create Date: 2026-10-18 19:12:44.208519
+
+"""
+
+# pylint: disable=C0103
+
+from typing import Sequence
+
+from alembic import op
+
+from database.migrations.sql import (
+    CREATE_MONITORING_RUN_SCHEDULED_TRIGGER_SQL,
+    CREATE_NOTIFY_MONITORING_RUN_SCHEDULED_FUNC_SQL,
+    DROP_NOTIFY_MONITORING_RUN_SCHEDULED_FUNC_SQL,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "f6a2c8d41b57"
+down_revision: str | None = "b3f9d4e6a172"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrades database."""
+    op.execute(CREATE_NOTIFY_MONITORING_RUN_SCHEDULED_FUNC_SQL)
+    op.execute(CREATE_MONITORING_RUN_SCHEDULED_TRIGGER_SQL)
+
+
+def downgrade() -> None:
+    """Downgrades database."""
+    op.execute(DROP_NOTIFY_MONITORING_RUN_SCHEDULED_FUNC_SQL)
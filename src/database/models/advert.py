@@ -23,6 +23,7 @@ class Advert(DatabaseModel):
     id: Mapped[int] = mapped_column(BigInteger(), primary_key=True)
     monitoring_id: Mapped[int] = mapped_column(BigInteger(), ForeignKey("monitorings.id"), index=True)
     monitoring_run_id: Mapped[int] = mapped_column(BigInteger(), ForeignKey("monitoring_runs.id"), index=True)
+    first_monitoring_run_id: Mapped[int] = mapped_column(BigInteger(), ForeignKey("monitoring_runs.id"), index=True)
     url: Mapped[str] = mapped_column(String(2000))
     title: Mapped[str] = mapped_column(String(100))
     description: Mapped[str | None] = mapped_column(String(300), nullable=True)
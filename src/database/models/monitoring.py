@@ -5,6 +5,8 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
+    Integer,
     Interval,
     String,
     UniqueConstraint,
@@ -27,7 +29,18 @@ class Monitoring(DatabaseModel):
     url: Mapped[str] = mapped_column(String(2000))
     run_interval: Mapped[timedelta] = mapped_column(Interval(), index=True)
     enabled: Mapped[bool] = mapped_column(Boolean(), default=True, server_default=text("true"))
+    adaptive_interval: Mapped[bool] = mapped_column(Boolean(), default=False, server_default=text("false"))
+    effective_run_interval: Mapped[timedelta | None] = mapped_column(Interval(), nullable=True)
+    next_run_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, server_default=text("now()")
+    )
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_success_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    consecutive_failures: Mapped[int] = mapped_column(Integer(), default=0, server_default=text("0"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, server_default=text("now()"))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, server_default=text("now()"))
 
-    __table_args__ = (UniqueConstraint("user_id", "url"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "url"),
+        Index("ix_monitorings_next_run_at", "next_run_at", postgresql_where=text("enabled")),
+    )
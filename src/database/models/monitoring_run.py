@@ -21,5 +21,6 @@ class MonitoringRun(DatabaseModel):
         index=True,
         server_default=text(f"'{MonitoringRunStatus.SCHEDULED}'"),
     )
+    error: Mapped[str | None] = mapped_column(String(500), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, server_default=text("now()"))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, server_default=text("now()"))
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import datetime, time
 
-from sqlalchemy import BigInteger, DateTime, Enum, text
+from sqlalchemy import BigInteger, Boolean, DateTime, Enum, Time, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from database.enums import UserLanguage
@@ -16,5 +16,9 @@ class User(DatabaseModel):
     language: Mapped[UserLanguage] = mapped_column(
         Enum(*UserLanguage.values(), name="user_language"), index=True, server_default=text(f"'{UserLanguage.EN}'")
     )
+    premium: Mapped[bool] = mapped_column(Boolean(), default=False, server_default=text("false"))
+    quiet_hours_enabled: Mapped[bool] = mapped_column(Boolean(), default=False, server_default=text("false"))
+    quiet_hours_start: Mapped[time] = mapped_column(Time(), server_default=text("'23:00'"))
+    quiet_hours_end: Mapped[time] = mapped_column(Time(), server_default=text("'07:00'"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, server_default=text("now()"))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, server_default=text("now()"))
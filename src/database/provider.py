@@ -1,7 +1,7 @@
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, overload
 
-from sqlalchemy import Select, UnaryExpression, delete, select, update
+from sqlalchemy import Select, UnaryExpression, delete, func, select, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -117,6 +117,21 @@ class DatabaseProvider:
         cursor = await self._session.execute(query)
         return [read_schema.model_validate(row) for row in cursor]
 
+    async def count(self, *, model: DatabaseModelType, filters: list[ColumnExpressionArgument] | None = None) -> int:
+        """Returns number of rows in the database.
+
+        Args:
+            model (DatabaseModelType): The database model for the query.
+            filters (list[ColumnExpressionArgument] | None): The conditions to filter the query. Default is None.
+
+        """
+        query = select(func.count()).select_from(model)  # pylint: disable=E1102
+        if filters:
+            query = query.where(*filters)
+
+        cursor = await self._session.execute(query)
+        return cursor.scalar_one()
+
     @overload
     async def create[
         T: DatabaseReadSchema
@@ -239,6 +254,34 @@ class DatabaseProvider:
         await self._session.refresh(row)
         return read_schema.model_validate(row)
 
+    async def update_all[
+        T: DatabaseReadSchema
+    ](
+        self,
+        *,
+        model: DatabaseModelType,
+        data: DatabaseUpdateSchema,
+        filters: list[ColumnExpressionArgument],
+        read_schema: type[T],
+    ) -> list[T]:
+        """Updates all matching rows in the database.
+
+        Args:
+            model (DatabaseModelType): The database model for the query.
+            data (DatabaseUpdateSchema): The data to update.
+            filters (list[ColumnExpressionArgument]): The conditions to filter the query.
+            read_schema (type[T]): The schema to validate the result.
+
+        Returns:
+            list[T]: Updated rows.
+
+        """
+        query = update(model).where(*filters).values(data.model_dump_for_update()).returning(model)
+        cursor = await self._session.execute(query)
+        rows = cursor.scalars().all()
+        await self._session.flush()
+        return [read_schema.model_validate(row) for row in rows]
+
     async def delete(self, *, model: DatabaseModelType, filters: list[ColumnExpressionArgument]) -> None:
         """Deletes rows from the database.
 
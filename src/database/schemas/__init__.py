@@ -5,6 +5,7 @@ from .monitoring import (
     MonitoringCreate,
     MonitoringDetailsRead,
     MonitoringRead,
+    MonitoringScheduleUpdate,
     MonitoringUpdate,
 )
 from .monitoring_run import MonitoringRunCreate, MonitoringRunRead, MonitoringRunUpdate
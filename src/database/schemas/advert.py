@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import ClassVar
+from typing import Any, ClassVar
 
 from pydantic import Field
 
@@ -17,6 +17,7 @@ class AdvertRead(DatabaseReadSchema):
     id: int
     monitoring_id: int
     monitoring_run_id: int
+    first_monitoring_run_id: int
     url: str
     title: str
     description: str | None
@@ -53,6 +54,10 @@ class AdvertCreate(DatabaseCreateSchema):
         "currency",
     ]
 
+    def model_dump_for_insert(self) -> dict[str, Any]:
+        """Returns the data to insert, the run that found the advert is kept as its first run."""
+        return super().model_dump_for_insert() | {"first_monitoring_run_id": self.monitoring_run_id}
+
 
 class AdvertUpdate(DatabaseUpdateSchema):
     """Advert schema for updating."""
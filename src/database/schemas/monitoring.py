@@ -20,6 +20,12 @@ class MonitoringRead(DatabaseReadSchema):
     url: str
     run_interval: timedelta
     enabled: bool
+    adaptive_interval: bool
+    effective_run_interval: timedelta | None
+    next_run_at: datetime | None
+    last_run_at: datetime | None
+    last_success_at: datetime | None
+    consecutive_failures: int
     created_at: datetime
     updated_at: datetime
 
@@ -40,6 +46,7 @@ class MonitoringCreate(DatabaseCreateSchema):
     url: StrHttpUrl = Field(max_length=2000)
     run_interval: timedelta
     enabled: bool | None = None
+    adaptive_interval: bool | None = None
 
 
 class MonitoringUpdate(DatabaseUpdateSchema):
@@ -49,3 +56,13 @@ class MonitoringUpdate(DatabaseUpdateSchema):
     url: StrHttpUrl | None = Field(default=None, max_length=2000)
     run_interval: timedelta | None = None
     enabled: bool | None = None
+    adaptive_interval: bool | None = None
+
+
+class MonitoringScheduleUpdate(DatabaseUpdateSchema):
+    """Monitoring schema for updating schedule after a run."""
+
+    next_run_at: datetime | None = None
+    last_success_at: datetime | None = None
+    effective_run_interval: timedelta | None = None
+    consecutive_failures: int | None = None
@@ -18,6 +18,7 @@ class MonitoringRunRead(DatabaseReadSchema):
     log_file: str | None
     duration: timedelta | None
     status: MonitoringRunStatus
+    error: str | None
     created_at: datetime
     updated_at: datetime
 
@@ -29,6 +30,7 @@ class MonitoringRunCreate(DatabaseCreateSchema):
     log_file: str | None = Field(default=None, max_length=200)
     duration: timedelta | None = None
     status: MonitoringRunStatus | None = None
+    error: str | None = Field(default=None, max_length=500)
 
 
 class MonitoringRunUpdate(DatabaseUpdateSchema):
@@ -37,3 +39,4 @@ class MonitoringRunUpdate(DatabaseUpdateSchema):
     log_file: str | None = Field(default=None, max_length=200)
     duration: timedelta | None = None
     status: MonitoringRunStatus | None = None
+    error: str | None = Field(default=None, max_length=500)
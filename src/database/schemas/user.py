@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, time
 
 from database.enums import UserLanguage
 from database.schemas.base import (
@@ -13,6 +13,10 @@ class UserRead(DatabaseReadSchema):
 
     id: int
     language: UserLanguage
+    premium: bool
+    quiet_hours_enabled: bool
+    quiet_hours_start: time
+    quiet_hours_end: time
     created_at: datetime
     updated_at: datetime
 
@@ -22,9 +26,16 @@ class UserCreate(DatabaseCreateSchema):
 
     id: int
     language: UserLanguage | None = None
+    premium: bool | None = None
+    quiet_hours_enabled: bool | None = None
+    quiet_hours_start: time | None = None
+    quiet_hours_end: time | None = None
 
 
 class UserUpdate(DatabaseUpdateSchema):
     """User schema for updating."""
 
     language: UserLanguage | None = None
+    quiet_hours_enabled: bool | None = None
+    quiet_hours_start: time | None = None
+    quiet_hours_end: time | None = None
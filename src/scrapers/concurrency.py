@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections import deque
+
+from pydantic import BaseModel
+
+
+class MarketplaceProfile(BaseModel):
+    """Crawl profile of a marketplace.
+
+    Attributes:
+        runs_per_minute (int): Maximum number of monitoring runs dispatched to the marketplace per minute.
+        run_deadline (int): Number of seconds after which a crawl stops requesting next pages.
+        max_pages (int): Maximum number of pages requested by a crawl.
+        initial_concurrency (int): Concurrent requests allowed before any feedback.
+        max_concurrency (int): Maximum number of concurrent requests.
+        request_delay (float): Minimum number of seconds between request starts.
+        target_latency (float): Response latency in seconds above which the marketplace is considered overloaded.
+        headers (dict[str, str]): Extra request headers.
+
+    """
+
+    runs_per_minute: int
+    run_deadline: int
+    max_pages: int
+    initial_concurrency: int
+    max_concurrency: int
+    request_delay: float
+    target_latency: float
+    headers: dict[str, str] = {}
+
+
+class AimdConcurrencyController:
+    """Concurrency limiter of requests to a marketplace with additive increase and multiplicative decrease.
+
+    Shared by all crawls of the marketplace in the worker process. Each successful response with latency
+    under the target adds `1 / limit` to the limit (so it grows by one per limit's worth of responses),
+    while a throttled (429), failed (5xx), lost or slow response halves it, at most once per target latency.
+    Request starts are also spaced by the profile's request delay.
+
+    Args:
+        profile (MarketplaceProfile): Request profile of the marketplace.
+
+    """
+
+    min_concurrency = 1
+    decrease_factor = 0.5
+
+    _profile: MarketplaceProfile
+    _limit: float
+    _in_flight: int
+    _waiters: deque[asyncio.Future[None]]
+    _next_start_at: float
+    _decreased_at: float
+
+    def __init__(self, profile: MarketplaceProfile) -> None:
+        self._profile = profile
+        self._limit = float(profile.initial_concurrency)
+        self._in_flight = 0
+        self._waiters = deque()
+        self._next_start_at = 0.0
+        self._decreased_at = 0.0
+
+    @property
+    def profile(self) -> MarketplaceProfile:
+        """Request profile of the marketplace."""
+        return self._profile
+
+    @property
+    def limit(self) -> int:
+        """Current number of concurrent requests allowed."""
+        return max(int(self._limit), self.min_concurrency)
+
+    async def acquire(self) -> None:
+        """Waits for a free request slot and for the request delay.
+
+        The slot is taken before the request delay, so it's freed if the caller is cancelled during the delay.
+
+        """
+        while self._in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                self._wake_up_waiters()
+                raise
+        self._in_flight += 1
+
+        now = time.monotonic()
+        start_at = max(self._next_start_at, now)
+        self._next_start_at = start_at + self._profile.request_delay
+        if start_at > now:
+            try:
+                await asyncio.sleep(start_at - now)
+            except asyncio.CancelledError:
+                self._in_flight -= 1
+                self._wake_up_waiters()
+                raise
+
+    def release(self, latency: float | None, status_code: int | None) -> None:
+        """Frees the request slot and adjusts the limit by the response.
+
+        Args:
+            latency (float | None): Response latency in seconds. None if the response was lost.
+            status_code (int | None): Response status code. None if the response was lost.
+
+        """
+        self._in_flight -= 1
+        if (
+            latency is None
+            or status_code is None
+            or status_code == 429
+            or status_code >= 500
+            or latency > self._profile.target_latency
+        ):
+            now = time.monotonic()
+            if now - self._decreased_at >= self._profile.target_latency:
+                self._limit = max(self._limit * self.decrease_factor, self.min_concurrency)
+                self._decreased_at = now
+        else:
+            self._limit = min(self._limit + 1 / self._limit, self._profile.max_concurrency)
+        self._wake_up_waiters()
+
+    def _wake_up_waiters(self) -> None:
+        """Wakes up as many waiters as there are free slots."""
+        for _ in range(self.limit - self._in_flight):
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    break
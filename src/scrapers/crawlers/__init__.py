@@ -1,4 +1,6 @@
-from .base_advert_crawler import BaseAdvertCrawler
+from scrapers.concurrency import MarketplaceProfile
+
+from .base_advert_crawler import BaseAdvertCrawler, CrawlLimits
 from .olx_ua_crawler import OlxUaCrawler
 from .shafa_ua_crawler import ShafaUaCrawler
 
@@ -6,3 +8,25 @@ MARKETPLACE_CRAWLERS_MAPPING: dict[str, type[BaseAdvertCrawler]] = {
     "Olx UA": OlxUaCrawler,
     "Shafa UA": ShafaUaCrawler,
 }
+
+MARKETPLACE_PROFILES: dict[str, MarketplaceProfile] = {
+    "Olx UA": MarketplaceProfile(
+        runs_per_minute=30,
+        run_deadline=120,
+        max_pages=25,
+        initial_concurrency=8,
+        max_concurrency=32,
+        request_delay=0.05,
+        target_latency=3.0,
+    ),
+    "Shafa UA": MarketplaceProfile(
+        runs_per_minute=60,
+        run_deadline=60,
+        max_pages=10,
+        initial_concurrency=2,
+        max_concurrency=8,
+        request_delay=0.5,
+        target_latency=2.0,
+        headers={"Accept": "application/json"},
+    ),
+}
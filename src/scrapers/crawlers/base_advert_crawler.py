@@ -1,35 +1,97 @@
+import logging
+import time
 from abc import ABC
+from collections import deque
+from datetime import timedelta
 from pathlib import Path
 
-from fastcrawl import BaseCrawler, CrawlerSettings, HttpClientSettings, LogSettings
+from fastcrawl import (
+    BaseCrawler,
+    CrawlerSettings,
+    HttpClientSettings,
+    LogSettings,
+    Request,
+    Response,
+)
 
+from database.schemas import AdvertCreate
+from scrapers.concurrency import AimdConcurrencyController
 from scrapers.pipelines import (
     DebugSaveAdvertPipeline,
     FilterDuplicateAdvertPipeline,
     PublishAdvertPipeline,
+    open_publish_pipelines,
 )
 from settings import ScrapersSettings
 
 
+class CrawlLimits:
+    """Limits of a crawl.
+
+    Args:
+        deadline (timedelta): Time after which next pages are not requested, counted from now.
+        max_pages (int): Maximum number of pages to request.
+        concurrency_controller (AimdConcurrencyController): Concurrency controller of the marketplace.
+
+    Attributes:
+        deadline_at (float): Monotonic time after which next pages are not requested.
+        max_pages (int): See `Args` section.
+        concurrency_controller (AimdConcurrencyController): See `Args` section.
+
+    """
+
+    deadline_at: float
+    max_pages: int
+    concurrency_controller: AimdConcurrencyController
+
+    def __init__(self, deadline: timedelta, max_pages: int, concurrency_controller: AimdConcurrencyController) -> None:
+        self.deadline_at = time.monotonic() + deadline.total_seconds()
+        self.max_pages = max_pages
+        self.concurrency_controller = concurrency_controller
+
+
 class BaseAdvertCrawler(BaseCrawler, ABC):
     """Base for all advert crawlers.
 
+    One crawl may serve several monitorings with the same URL, each scraped advert is fanned out to all of them.
+    Each crawler gets its own logger writing to the run's log file, so `close` must be called after `run`
+    to release them in long-lived workers. It also finishes publish pipelines left open by a cancelled crawl,
+    so their buffered adverts are published and their broker connections are closed.
+
+    The crawl is limited cooperatively: crawlers request next pages only while `follow_next_page` allows it,
+    i.e. until the page cap of its limits is reached or the deadline has passed. A crawl stopped by a limit
+    is truncated.
+
+    Requests to the marketplace are limited by its concurrency controller shared by all crawls in the worker:
+    crawlers pass each request through `start_request` and each response through `finish_request`.
+
     Args:
-        monitoring_id (int): Monitoring ID.
-        monitoring_run_id (int): Monitoring run ID.
+        monitoring_ids (dict[int, int]): Monitoring IDs by IDs of runs served by the crawl.
         monitoring_url (str): Monitoring URL to start scraping from.
         log_file (Path): Path to the log file.
+        limits (CrawlLimits): Limits of the crawl.
 
     Attributes:
-        See `Args` section.
+        monitoring_ids (dict[int, int]): See `Args` section.
+        monitoring_url (str): See `Args` section.
+        pages (int): Number of requested pages.
+        truncated (bool): Whether the crawl was stopped by the page cap or the deadline.
 
     """
 
-    monitoring_id: int
-    monitoring_run_id: int
+    monitoring_ids: dict[int, int]
     monitoring_url: str
+    pages: int
+    truncated: bool
+
+    _limits: CrawlLimits
+    _request_started_at: deque[float]
+    _publish_pipelines: list[PublishAdvertPipeline]
 
-    def __init__(self, monitoring_id: int, monitoring_run_id: int, monitoring_url: str, log_file: Path) -> None:
+    def __init__(
+        self, monitoring_ids: dict[int, int], monitoring_url: str, log_file: Path, limits: CrawlLimits
+    ) -> None:
+        monitoring_run_id = next(iter(monitoring_ids))
         scrapers_settings = ScrapersSettings()
         crawler_settings = CrawlerSettings(
             workers=scrapers_settings.concurrency,
@@ -40,7 +102,9 @@ class BaseAdvertCrawler(BaseCrawler, ABC):
                 file=log_file,
                 logger_name_suffix=str(monitoring_run_id),
             ),
-            http_client=HttpClientSettings(headers={"User-Agent": scrapers_settings.user_agent}),
+            http_client=HttpClientSettings(
+                headers={"User-Agent": scrapers_settings.user_agent, **limits.concurrency_controller.profile.headers}
+            ),
         )
         if scrapers_settings.debug_mode:
             crawler_settings.pipelines.append(DebugSaveAdvertPipeline)
@@ -48,9 +112,97 @@ class BaseAdvertCrawler(BaseCrawler, ABC):
             crawler_settings.pipelines.append(PublishAdvertPipeline)
 
         super().__init__(settings=crawler_settings)
-        self.monitoring_id = monitoring_id
-        self.monitoring_run_id = monitoring_run_id
+        self.monitoring_ids = monitoring_ids
         self.monitoring_url = monitoring_url
+        self.pages = 1
+        self.truncated = False
+        self._limits = limits
+        self._request_started_at = deque()
+        self._publish_pipelines = []
+
+    @property
+    def monitoring_id(self) -> int:
+        """ID of the monitoring of the first run served by the crawl."""
+        return next(iter(self.monitoring_ids.values()))
+
+    @property
+    def monitoring_run_id(self) -> int:
+        """ID of the first run served by the crawl."""
+        return next(iter(self.monitoring_ids))
+
+    async def run(self) -> None:
+        """Runs the crawl, tracking its publish pipelines until they finish."""
+        open_publish_pipelines.set(self._publish_pipelines)
+        await super().run()
+
+    async def start_request(self, request: Request) -> Request:
+        """Waits for a request slot of the marketplace and returns the request.
+
+        Args:
+            request (Request): Request to start.
+
+        """
+        await self._limits.concurrency_controller.acquire()
+        self._request_started_at.append(time.monotonic())
+        return request
+
+    def finish_request(self, response: Response) -> None:
+        """Frees the request slot of the response and reports its latency and status to the controller.
+
+        Args:
+            response (Response): Received response.
+
+        """
+        if self._request_started_at:
+            latency = time.monotonic() - self._request_started_at.popleft()
+            self._limits.concurrency_controller.release(latency, response.status_code)
+
+    def follow_next_page(self) -> bool:
+        """Returns whether the next page may be requested, counting it as requested if so."""
+        if self.pages >= self._limits.max_pages:
+            self.logger.warning("Page cap of %s pages is reached, stopping crawl", self._limits.max_pages)
+        elif time.monotonic() >= self._limits.deadline_at:
+            self.logger.warning("Deadline is reached after %s pages, stopping crawl", self.pages)
+        else:
+            self.pages += 1
+            return True
+        self.truncated = True
+        return False
+
+    async def close(self) -> None:
+        """Releases resources of the crawl.
+
+        Publish pipelines left open by a cancelled crawl are finished. Slots of requests left without response
+        (e.g. failed or cancelled) are freed as lost. Handlers of the crawler's logger are closed and the logger
+        is removed from the logging manager: it is unique per run, so without it the worker leaks a logger
+        and an open log file per run.
+
+        """
+        while self._publish_pipelines:
+            pipeline = self._publish_pipelines.pop()
+            try:
+                await pipeline.on_finish()
+            except Exception:  # pylint: disable=W0718
+                self.logger.exception("Failed to finish publish pipeline of cancelled crawl")
+        while self._request_started_at:
+            self._request_started_at.popleft()
+            self._limits.concurrency_controller.release(None, None)
+        for handler in self.logger.handlers[:]:
+            self.logger.removeHandler(handler)
+            handler.close()
+        logging.Logger.manager.loggerDict.pop(self.logger.name, None)
+
+    def fan_out_advert(self, advert: AdvertCreate) -> list[AdvertCreate]:
+        """Returns copies of the advert for all runs served by the crawl.
+
+        Args:
+            advert (AdvertCreate): Advert scraped for the first run.
+
+        """
+        return [
+            advert.model_copy(update={"monitoring_id": monitoring_id, "monitoring_run_id": monitoring_run_id})
+            for monitoring_run_id, monitoring_id in self.monitoring_ids.items()
+        ]
 
     def crop_advert_description(self, description: str | None) -> str | None:
         """Returns cropped advert description if it's not None.
@@ -1,11 +1,10 @@
-import json
-from typing import Any, AsyncIterator
+from typing import AsyncIterator
 
 from fastcrawl import Request, Response
-from parsel import Selector
 
 from database.schemas import AdvertCreate
 from scrapers.crawlers.base_advert_crawler import BaseAdvertCrawler
+from scrapers.parsers import parse_olx_ua_search_page, run_parser
 
 
 class OlxUaCrawler(BaseAdvertCrawler):
@@ -13,11 +12,13 @@ class OlxUaCrawler(BaseAdvertCrawler):
 
     async def generate_requests(self) -> AsyncIterator[Request]:
         """Yields request with monitoring URL to start scraping."""
-        yield Request(url=self.monitoring_url, callback=self.parse_search_page)
+        yield await self.start_request(Request(url=self.monitoring_url, callback=self.parse_search_page))
 
     async def parse_search_page(self, response: Response) -> AsyncIterator[AdvertCreate | Request]:
         """Parses search page.
 
+        The page HTML is parsed by `parse_olx_ua_search_page` in the parser process pool, if it's enabled.
+
         Args:
             response (Response): Search page response.
 
@@ -26,7 +27,8 @@ class OlxUaCrawler(BaseAdvertCrawler):
             Request: Next page request.
 
         """
-        raw_adverts = self._get_raw_adverts(response.selector)
+        self.finish_request(response)
+        raw_adverts, next_page_url = await run_parser(parse_olx_ua_search_page, response.text)
 
         for raw_advert in raw_adverts:
             if "url" not in raw_advert or "title" not in raw_advert:
@@ -34,7 +36,7 @@ class OlxUaCrawler(BaseAdvertCrawler):
                 continue
 
             price_data = (raw_advert.get("price") or {}).get("regularPrice") or {}
-            yield AdvertCreate(
+            advert = AdvertCreate(
                 monitoring_id=self.monitoring_id,
                 monitoring_run_id=self.monitoring_run_id,
                 url=raw_advert["url"],
@@ -44,27 +46,10 @@ class OlxUaCrawler(BaseAdvertCrawler):
                 price=price_data.get("value") or None,
                 currency=price_data.get("currencyCode") or None,
             )
+            for monitoring_advert in self.fan_out_advert(advert):
+                yield monitoring_advert
 
-        if next_page_url := response.selector.xpath(".//a[@data-cy='pagination-forward']/@href").get():
-            yield Request(url=response.url.join(next_page_url), callback=self.parse_search_page)
-
-    def _get_raw_adverts(self, selector: Selector) -> list[dict[str, Any]]:
-        """Returns extracted raw adverts.
-
-        Args:
-            selector (Selector): Page selector.
-
-        Raises:
-            ValueError: If advert data not found.
-
-        """
-        raw_data = selector.xpath(".//script[@id='olx-init-config']/text()").re_first(
-            r'window.__PRERENDERED_STATE__\s*=\s*"(.*)";'
-        )
-        if not raw_data:
-            raise ValueError("Advert data not found")
-
-        raw_data = raw_data.replace("\\\\", "\\").replace(r"\"", '"')
-        raw_data = json.dumps(json.loads(raw_data), ensure_ascii=False)
-        raw_data = raw_data.replace("<br />", "")
-        return ((json.loads(raw_data).get("listing") or {}).get("listing") or {}).get("ads") or []
+        if next_page_url and self.follow_next_page():
+            yield await self.start_request(
+                Request(url=response.url.join(next_page_url), callback=self.parse_search_page)
+            )
@@ -12,7 +12,7 @@ class ShafaUaCrawler(BaseAdvertCrawler):
 
     async def generate_requests(self) -> AsyncIterator[Request]:
         """Yields GraphQL request to start scraping."""
-        yield self._build_graphql_request()
+        yield await self.start_request(self._build_graphql_request())
 
     async def parse_catalog(
         self, response: Response, metadata: dict[str, Any]
@@ -27,11 +27,12 @@ class ShafaUaCrawler(BaseAdvertCrawler):
             Request: Next page request.
 
         """
+        self.finish_request(response)
         products = response.get_json_data()["data"]["products"]
 
         for product in products["edges"]:
             node = product["node"]
-            yield AdvertCreate(
+            advert = AdvertCreate(
                 monitoring_id=self.monitoring_id,
                 monitoring_run_id=self.monitoring_run_id,
                 url="https://shafa.ua" + node["url"],
@@ -40,9 +41,11 @@ class ShafaUaCrawler(BaseAdvertCrawler):
                 price=node["price"],
                 currency="UAH",
             )
+            for monitoring_advert in self.fan_out_advert(advert):
+                yield monitoring_advert
 
-        if products["pageInfo"]["hasNextPage"]:
-            yield self._build_graphql_request(metadata["page"] + 1)
+        if products["pageInfo"]["hasNextPage"] and self.follow_next_page():
+            yield await self.start_request(self._build_graphql_request(metadata["page"] + 1))
 
     def _build_graphql_request(self, page: int = 1) -> Request:
         """Returns GraphQL request.
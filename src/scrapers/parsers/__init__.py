@@ -0,0 +1,2 @@
+from .olx_ua_parser import parse_olx_ua_search_page
+from .pool import run_parser, shutdown_parser_pool
@@ -0,0 +1,40 @@
+import json
+from typing import Any
+
+from parsel import Selector
+
+OLX_UA_ADVERT_FIELDS = ["url", "title", "description", "photos", "price"]
+
+
+def parse_olx_ua_search_page(html: str) -> tuple[list[dict[str, Any]], str | None]:
+    """Returns compact adverts data and next page URL of the `olx.ua` search page.
+
+    Adverts are reduced to the fields used by the crawler, so the result is cheap to send between processes.
+
+    Args:
+        html (str): Search page HTML.
+
+    Raises:
+        ValueError: If advert data not found.
+
+    """
+    selector = Selector(text=html)
+    raw_data = selector.xpath(".//script[@id='olx-init-config']/text()").re_first(
+        r'window.__PRERENDERED_STATE__\s*=\s*"(.*)";'
+    )
+    if not raw_data:
+        raise ValueError("Advert data not found")
+
+    raw_data = raw_data.replace("\\\\", "\\").replace(r"\"", '"')
+    raw_data = json.dumps(json.loads(raw_data), ensure_ascii=False)
+    raw_data = raw_data.replace("<br />", "")
+    raw_adverts = ((json.loads(raw_data).get("listing") or {}).get("listing") or {}).get("ads") or []
+
+    adverts = []
+    for raw_advert in raw_adverts:
+        advert = {field: raw_advert[field] for field in OLX_UA_ADVERT_FIELDS if field in raw_advert}
+        if advert.get("photos"):
+            advert["photos"] = advert["photos"][:1]
+        adverts.append(advert)
+    next_page_url = selector.xpath(".//a[@data-cy='pagination-forward']/@href").get()
+    return adverts, next_page_url
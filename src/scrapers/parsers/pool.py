@@ -0,0 +1,41 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from settings import ScrapersSettings
+
+scrapers_settings = ScrapersSettings()
+_parser_pool: ProcessPoolExecutor | None = None
+
+
+async def run_parser[T](parser: Callable[..., T], *args: Any) -> T:
+    """Runs CPU-bound page parser and returns its result.
+
+    If `parse_processes` setting is positive, the parser runs in a process pool, so the event loop keeps serving
+    network I/O and broker heartbeats while pages are parsed. Otherwise the parser runs in the event loop.
+    Parsers must be module-level functions with picklable arguments and results.
+    The setting is read once at import, not on every parsed page.
+
+    Args:
+        parser (Callable[..., T]): Parser to run.
+        *args (Any): Arguments of the parser.
+
+    """
+    global _parser_pool  # pylint: disable=W0603
+    if scrapers_settings.parse_processes <= 0:
+        return parser(*args)
+    if _parser_pool is None:
+        _parser_pool = ProcessPoolExecutor(
+            max_workers=scrapers_settings.parse_processes, mp_context=multiprocessing.get_context("spawn")
+        )
+    return await asyncio.get_running_loop().run_in_executor(_parser_pool, parser, *args)
+
+
+async def shutdown_parser_pool() -> None:
+    """Shuts down the process pool of parsers, if it was started."""
+    global _parser_pool  # pylint: disable=W0603
+    if _parser_pool is None:
+        return
+    parser_pool, _parser_pool = _parser_pool, None
+    parser_pool.shutdown(cancel_futures=True)
@@ -1,3 +1,3 @@
 from .debug_save_advert_pipeline import DebugSaveAdvertPipeline
 from .filter_duplicate_advert_pipeline import FilterDuplicateAdvertPipeline
-from .publish_advert_pipeline import PublishAdvertPipeline
+from .publish_advert_pipeline import PublishAdvertPipeline, open_publish_pipelines
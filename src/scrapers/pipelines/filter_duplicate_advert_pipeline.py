@@ -4,23 +4,23 @@ from database.schemas import AdvertCreate
 
 
 class FilterDuplicateAdvertPipeline(BasePipeline):
-    """Pipeline to filter duplicate adverts.
+    """Pipeline to filter duplicate adverts of each monitoring.
 
     Attributes:
-        unique_advert_urls (set[str]): A set to store unique advert urls.
+        unique_advert_urls (set[tuple[int, str]]): A set to store unique pairs of monitoring ID and advert url.
 
     """
 
     allowed_items = [AdvertCreate]
 
-    unique_advert_urls: set[str]
+    unique_advert_urls: set[tuple[int, str]]
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.unique_advert_urls = set()
 
     async def process_item(self, item: AdvertCreate) -> AdvertCreate | None:
-        """Filters duplicate adverts based on the advert's url.
+        """Filters duplicate adverts based on the advert's monitoring and url.
 
         Args:
             item (AdvertCreate): The advert to filter.
@@ -30,9 +30,9 @@ class FilterDuplicateAdvertPipeline(BasePipeline):
             None: If the advert is a duplicate.
 
         """
-        advert_url = str(item.url)
-        if advert_url in self.unique_advert_urls:
+        advert_key = (item.monitoring_id, str(item.url))
+        if advert_key in self.unique_advert_urls:
             return None
 
-        self.unique_advert_urls.add(advert_url)
+        self.unique_advert_urls.add(advert_key)
         return item
@@ -1,36 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from contextvars import ContextVar
+
 from fastcrawl import BasePipeline
 from faststream.rabbit import RabbitBroker
 
 from database.schemas import AdvertCreate
-from settings import TasksSettings
+from settings import ScrapersSettings, TasksSettings
 from tasks.queues import SCRAPING_RESULTS_QUEUE
 
+open_publish_pipelines: ContextVar[list[PublishAdvertPipeline]] = ContextVar("open_publish_pipelines")
+
 
 class PublishAdvertPipeline(BasePipeline):
-    """Pipeline to publish advert to message broker."""
+    """Pipeline to publish advert to message broker.
+
+    One broker connection is held for the whole crawl. Adverts are buffered and published in batches
+    of `publish_batch_size` or after `publish_linger` seconds since the first buffered advert, whichever
+    comes first. Messages of a batch are published concurrently and confirmed by the broker,
+    so a batch costs about one round trip.
+
+    Started pipelines are added to the `open_publish_pipelines` list of the crawl's context until they finish,
+    so the crawler can finish them itself if the crawl is cancelled before fastcrawl does.
+
+    """
 
     allowed_items = [AdvertCreate]
 
     _broker: RabbitBroker
+    _batch_size: int
+    _linger: float
+    _buffer: list[AdvertCreate]
+    _flush_lock: asyncio.Lock
+    _linger_task: asyncio.Task | None
+    _linger_error: Exception | None
 
     async def on_start(self) -> None:
-        """Initializes message broker."""
-        self._broker = RabbitBroker(TasksSettings().get_broker_url())
+        """Connects to message broker."""
+        scrapers_settings = ScrapersSettings()
+        self._batch_size = scrapers_settings.publish_batch_size
+        self._linger = scrapers_settings.publish_linger
+        self._buffer = []
+        self._flush_lock = asyncio.Lock()
+        self._linger_task = None
+        self._linger_error = None
+        self._broker = RabbitBroker(TasksSettings().get_broker_url(), publisher_confirms=True)
+        open_publish_pipelines.get([]).append(self)
+        await self._broker.connect()
 
     async def on_finish(self) -> None:
-        """Closes message broker."""
-        await self._broker.close()
+        """Publishes buffered adverts and closes message broker."""
+        try:
+            if self._linger_task is not None:
+                self._linger_task.cancel()
+                self._linger_task = None
+            await self._flush()
+            self._raise_linger_error()
+        finally:
+            await self._broker.close()
+            pipelines = open_publish_pipelines.get([])
+            if self in pipelines:
+                pipelines.remove(self)
 
     async def process_item(self, item: AdvertCreate) -> AdvertCreate:
-        """Publishes advert to message broker.
+        """Buffers advert to publish it to message broker with the next batch.
 
         Args:
             item (AdvertCreate): Advert to publish.
 
         Returns:
-            AdvertCreate: Published advert.
+            AdvertCreate: Buffered advert.
 
         """
-        async with self._broker:
-            await self._broker.publish(message=item, queue=SCRAPING_RESULTS_QUEUE, persist=True)
+        self._raise_linger_error()
+        self._buffer.append(item)
+        if len(self._buffer) >= self._batch_size:
+            if self._linger_task is not None:
+                self._linger_task.cancel()
+                self._linger_task = None
+            await self._flush()
+        elif self._linger_task is None:
+            self._linger_task = asyncio.create_task(self._flush_after_linger())
         return item
+
+    async def _flush(self) -> None:
+        """Publishes buffered adverts and waits for their confirmation, after the previous batch is confirmed."""
+        async with self._flush_lock:
+            adverts, self._buffer = self._buffer, []
+            if not adverts:
+                return
+            await asyncio.gather(
+                *(
+                    self._broker.publish(message=advert, queue=SCRAPING_RESULTS_QUEUE, persist=True)
+                    for advert in adverts
+                )
+            )
+
+    async def _flush_after_linger(self) -> None:
+        """Publishes buffered adverts after the linger time, keeping the error for the next call."""
+        await asyncio.sleep(self._linger)
+        self._linger_task = None
+        try:
+            await self._flush()
+        except Exception as exc:  # pylint: disable=W0718
+            self._linger_error = exc
+
+    def _raise_linger_error(self) -> None:
+        """Raises the error of the last publishing after the linger time, if any.
+
+        Raises:
+            Exception: Error of the last publishing after the linger time.
+
+        """
+        if self._linger_error is not None:
+            error, self._linger_error = self._linger_error, None
+            raise error
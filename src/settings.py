@@ -31,6 +31,9 @@ class ApiSettings(BaseSettings):
     host: str
     port: int
     security_key: str
+    max_monitorings_per_user: int
+    min_run_interval: int
+    premium_min_run_interval: int
 
     model_config = SettingsConfigDict(env_prefix="api_", env_file=find_dotenv(), extra="ignore")
 
@@ -45,6 +48,9 @@ class ScrapersSettings(BaseSettings):
     log_level: str
     user_agent: str
     concurrency: int
+    parse_processes: int
+    publish_batch_size: int
+    publish_linger: float
     debug_mode: bool
 
     model_config = SettingsConfigDict(env_prefix="scrapers_", env_file=find_dotenv(), extra="ignore")
@@ -60,6 +66,19 @@ class TasksSettings(BaseSettings):
     broker_user: str
     broker_password: str
     broker_vhost: str
+    scheduler_sync_interval: int
+    scheduler_catch_up_rate: int
+    trigger_leader_check_interval: int
+    trigger_shards: int
+    trigger_max_shards_per_worker: int
+    run_heartbeat_interval: int
+    run_heartbeat_timeout: int
+    run_queued_timeout: int
+    reaper_interval: int
+    user_crawl_seconds_per_hour: int
+    worker_max_rss: int
+    worker_max_tasks: int
+    worker_graceful_timeout: int
 
     model_config = SettingsConfigDict(env_prefix="tasks_", env_file=find_dotenv(), extra="ignore")
 
@@ -1,58 +1,33 @@
 import argparse
 import asyncio
 import logging
-
-from faststream import FastStream
-from faststream.rabbit import RabbitBroker
-from taskiq.cli.scheduler.run import SchedulerArgs
-from taskiq.cli.scheduler.run import run_scheduler as run_scheduler_
-from taskiq.schedule_sources import LabelScheduleSource
-from taskiq_faststream import BrokerWrapper, StreamScheduler
+from datetime import timedelta
 
 from settings import TasksSettings
-from tasks.queues import TRIGGER_SCRAPING_TASKS_QUEUE
-from tasks.routers import scraping_router, trigger_router
-
-
-async def get_broker(settings: TasksSettings) -> RabbitBroker:
-    """Returns a RabbitMQ broker instance."""
-    return RabbitBroker(settings.get_broker_url())
-
+from tasks.reaper import StaleRunReaper
+from tasks.scheduler import MonitoringScheduler
+from tasks.supervisor import WorkerSupervisor
+from tasks.worker import QUEUE_ROUTERS, get_broker, run_worker, run_worker_process
 
-async def run_worker(settings: TasksSettings) -> None:
-    """Runs the FastStream worker."""
-    broker = await get_broker(settings)
-    broker.include_router(trigger_router)
-    broker.include_router(scraping_router)
 
-    app = FastStream(broker)
-    await app.run(log_level=logging.getLevelName(settings.log_level))
+async def run_scheduler(settings: TasksSettings, shards: list[int] | None) -> None:
+    """Runs the monitoring scheduler and the stale run reaper.
 
+    Args:
+        settings (TasksSettings): Tasks settings.
+        shards (list[int] | None): Shards to schedule and reap. If not provided, all shards are handled.
 
-async def run_scheduler(settings: TasksSettings) -> None:
-    """Runs the FastStream scheduler."""
+    """
+    logging.basicConfig(level=settings.log_level)
     broker = await get_broker(settings)
-
-    taskiq_broker = BrokerWrapper(broker)
-    taskiq_broker.task(
-        queue=TRIGGER_SCRAPING_TASKS_QUEUE,
-        schedule=[{"cron": "* * * * *"}],
-    )
-
-    scheduler = StreamScheduler(
-        broker=taskiq_broker,
-        sources=[LabelScheduleSource(taskiq_broker)],
-    )
-    await run_scheduler_(
-        SchedulerArgs(
-            scheduler=scheduler,
-            log_level=settings.log_level,
-            modules=[],
-        ),
-    )
+    scheduler = MonitoringScheduler(broker=broker, settings=settings, shards=shards)
+    reaper = StaleRunReaper(settings=settings, shards=shards)
+    async with asyncio.TaskGroup() as task_group:
+        task_group.create_task(scheduler.run())
+        task_group.create_task(reaper.run())
 
 
-async def main() -> None:
+def main() -> None:
     """Runs the FastStream application."""
     arg_parser = argparse.ArgumentParser()
     arg_parser.add_argument(
@@ -60,14 +35,42 @@ async def main() -> None:
         choices=["worker", "scheduler"],
         help="The type of FastStream application to run.",
     )
+    arg_parser.add_argument(
+        "--shards",
+        type=int,
+        nargs="+",
+        help="The trigger shards to schedule (scheduler only). All shards are scheduled by default.",
+    )
+    arg_parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="The number of worker processes run by the supervisor (worker only). Default is 1, without supervisor.",
+    )
+    arg_parser.add_argument(
+        "--queues",
+        choices=list(QUEUE_ROUTERS),
+        nargs="+",
+        default=list(QUEUE_ROUTERS),
+        help="The queues to consume (worker only). All queues are consumed by default.",
+    )
     args = arg_parser.parse_args()
 
     settings = TasksSettings()
-    if args.app_type == "worker":
-        await run_worker(settings)
+    if args.app_type == "scheduler":
+        asyncio.run(run_scheduler(settings, args.shards))
+    elif args.processes > 1:
+        logging.basicConfig(level=settings.log_level)
+        supervisor = WorkerSupervisor(
+            target=run_worker_process,
+            args=(args.queues,),
+            processes=args.processes,
+            graceful_timeout=timedelta(seconds=settings.worker_graceful_timeout),
+        )
+        supervisor.run()
     else:
-        await run_scheduler(settings)
+        asyncio.run(run_worker(settings, args.queues))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
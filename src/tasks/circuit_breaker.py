@@ -0,0 +1,159 @@
+import logging
+from datetime import datetime, timedelta
+
+from pydantic import BaseModel
+from sqlalchemy import func, select
+
+from database import get_database
+from database.enums import MonitoringRunStatus
+from database.models import Marketplace, Monitoring, MonitoringRun
+from database.schemas import DatabaseReadSchema
+
+logger = logging.getLogger(__name__)
+
+FAILED_RUN_STATUSES = [MonitoringRunStatus.FAILED, MonitoringRunStatus.TIMEOUT]
+SUCCEEDED_RUN_STATUSES = [MonitoringRunStatus.SUCCESS, MonitoringRunStatus.PARTIAL]
+
+
+class MarketplaceRunStats(DatabaseReadSchema):
+    """Statistics of finished runs of a marketplace."""
+
+    runs: int
+    failures: int
+    last_success_at: datetime | None
+
+
+class CircuitBreakerProfile(BaseModel):
+    """Thresholds of a circuit breaker.
+
+    Attributes:
+        failure_rate (float): Failure rate that opens the breaker.
+        min_runs (int): Minimum number of finished runs to evaluate the failure rate.
+        window (timedelta): Window of finished runs to evaluate the failure rate.
+        probe_interval (timedelta): Interval between probe runs while the breaker is open.
+        check_interval (timedelta): Interval between refreshes of run statistics.
+
+    """
+
+    failure_rate: float
+    min_runs: int
+    window: timedelta
+    probe_interval: timedelta
+    check_interval: timedelta
+
+
+class CircuitBreaker:
+    """Circuit breaker that sheds crawl load of a marketplace during its outages.
+
+    The breaker opens when at least `failure_rate` of the marketplace's runs finished within `window`
+    (and since the breaker was last closed) failed, provided there are at least `min_runs` of them.
+    Only runs finished by workers are counted, runs reaped or not published don't tell about the marketplace.
+    While it is open, only one probe run per `probe_interval` is admitted. The breaker closes
+    as soon as a run of the marketplace succeeds after it was opened.
+    Run statistics are refreshed from the database at most once per `check_interval`.
+
+    Args:
+        marketplace_name (str): Name of the marketplace.
+        profile (CircuitBreakerProfile): Thresholds of the breaker.
+
+    """
+
+    _marketplace_name: str
+    _profile: CircuitBreakerProfile
+    _opened_at: datetime | None
+    _closed_at: datetime | None
+    _probed_at: datetime | None
+    _checked_at: datetime | None
+
+    def __init__(self, marketplace_name: str, profile: CircuitBreakerProfile) -> None:
+        self._marketplace_name = marketplace_name
+        self._profile = profile
+        self._opened_at = None
+        self._closed_at = None
+        self._probed_at = None
+        self._checked_at = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the breaker is open."""
+        return self._opened_at is not None
+
+    async def refresh(self, now: datetime) -> None:
+        """Opens or closes the breaker by recent run statistics, if they are due to be checked.
+
+        Args:
+            now (datetime): Current time.
+
+        """
+        if self._checked_at is not None and now - self._checked_at < self._profile.check_interval:
+            return
+        self._checked_at = now
+
+        since = now - self._profile.window
+        if self._opened_at is not None:
+            since = self._opened_at
+        elif self._closed_at is not None:
+            since = max(since, self._closed_at)
+        async with get_database() as database:
+            stats = await database.get_by_query(
+                query=select(
+                    func.count().label("runs"),  # pylint: disable=E1102
+                    func.count()  # pylint: disable=E1102
+                    .filter(MonitoringRun.status.in_(FAILED_RUN_STATUSES))
+                    .label("failures"),
+                    func.max(MonitoringRun.updated_at)
+                    .filter(MonitoringRun.status.in_(SUCCEEDED_RUN_STATUSES))
+                    .label("last_success_at"),
+                )
+                .join(Monitoring, Monitoring.id == MonitoringRun.monitoring_id)
+                .join(Marketplace, Marketplace.id == Monitoring.marketplace_id)
+                .where(
+                    Marketplace.name == self._marketplace_name,
+                    MonitoringRun.status.in_(FAILED_RUN_STATUSES + SUCCEEDED_RUN_STATUSES),
+                    MonitoringRun.duration.is_not(None),
+                    MonitoringRun.updated_at >= since,
+                ),
+                by_mappings=True,
+                read_schema=MarketplaceRunStats,
+            )
+        if stats is None:
+            return
+
+        if self._opened_at is None:
+            if stats.runs >= self._profile.min_runs and stats.failures >= stats.runs * self._profile.failure_rate:
+                logger.warning(
+                    "Opened circuit breaker of %s: %s of %s recent runs failed",
+                    self._marketplace_name,
+                    stats.failures,
+                    stats.runs,
+                )
+                self._opened_at = now
+        elif stats.last_success_at is not None:
+            logger.info("Closed circuit breaker of %s: probe run succeeded", self._marketplace_name)
+            self._opened_at = None
+            self._closed_at = now
+
+    def allow(self, now: datetime) -> bool:
+        """Returns whether a run of the marketplace may be dispatched, taking a probe slot if the breaker is open.
+
+        Args:
+            now (datetime): Current time.
+
+        """
+        if self._opened_at is None:
+            return True
+        if self._probed_at is not None and now - self._probed_at < self._profile.probe_interval:
+            return False
+        self._probed_at = now
+        return True
+
+    def get_retry_at(self, now: datetime) -> datetime:
+        """Returns time of the next probe slot, when runs rejected by the open breaker should be retried.
+
+        Args:
+            now (datetime): Current time.
+
+        """
+        if self._probed_at is None:
+            return now
+        return max(self._probed_at + self._profile.probe_interval, now)
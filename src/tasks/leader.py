@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import random
+from datetime import timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from database.provider import engine
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElection:
+    """Cluster-wide leader election based on PostgreSQL session-level advisory locks.
+
+    Each lock represents a shard of work. The process holds up to `max_locks` of them on a dedicated
+    connection that is checked with a heartbeat. If a leader dies, PostgreSQL releases its locks once
+    the connection is dropped (TCP keepalives are configured to detect dead connections within seconds),
+    and the standbys acquire them on their next attempt.
+
+    Subclasses may override `on_acquired` and `on_released` to start and stop work of the acquired and released locks.
+
+    Args:
+        lock_ids (list[int]): Advisory lock keys.
+        max_locks (int): Maximum number of locks held by the process.
+        check_interval (timedelta): Interval between acquisition attempts and heartbeats.
+
+    Attributes:
+        held_lock_ids (set[int]): Keys of the locks held by the process.
+
+    """
+
+    held_lock_ids: set[int]
+
+    _lock_ids: list[int]
+    _max_locks: int
+    _check_interval: timedelta
+    _connection: AsyncConnection | None
+    _task: asyncio.Task | None
+
+    def __init__(self, lock_ids: list[int], max_locks: int, check_interval: timedelta) -> None:
+        self.held_lock_ids = set()
+        self._lock_ids = lock_ids
+        self._max_locks = max_locks
+        self._check_interval = check_interval
+        self._connection = None
+        self._task = None
+
+    def is_leader(self, lock_id: int) -> bool:
+        """Returns whether the process holds the lock.
+
+        Args:
+            lock_id (int): Advisory lock key.
+
+        """
+        return lock_id in self.held_lock_ids
+
+    async def start(self) -> None:
+        """Starts the election loop in background."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the election loop and releases the locks."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._close_connection()
+
+    async def on_acquired(self, lock_id: int) -> None:
+        """Called after the lock is acquired.
+
+        Args:
+            lock_id (int): Advisory lock key.
+
+        """
+
+    async def on_released(self, lock_ids: set[int]) -> None:
+        """Called when the locks are about to be released or are already lost, before their connection is closed.
+
+        Args:
+            lock_ids (set[int]): Advisory lock keys.
+
+        """
+
+    async def _run(self) -> None:
+        """Tries to acquire free locks and checks the held ones at each interval."""
+        while True:
+            try:
+                await asyncio.wait_for(self._check(), timeout=self._check_interval.total_seconds())
+            except Exception:  # pylint: disable=W0718
+                logger.exception("Failed to check locks, releasing held locks %s", self.held_lock_ids)
+                await self._close_connection()
+            await asyncio.sleep(self._check_interval.total_seconds())
+
+    async def _check(self) -> None:
+        """Checks the connection and acquires free locks while the limit is not reached."""
+        if self._connection is None:
+            self._connection = await self._open_connection()
+
+        await self._connection.execute(select(1))
+
+        free_lock_ids = [lock_id for lock_id in self._lock_ids if lock_id not in self.held_lock_ids]
+        random.shuffle(free_lock_ids)
+        for lock_id in free_lock_ids:
+            if len(self.held_lock_ids) >= self._max_locks:
+                break
+            result = await self._connection.execute(select(func.pg_try_advisory_lock(lock_id)))
+            if result.scalar():
+                self.held_lock_ids.add(lock_id)
+                logger.info("Became leader for lock %s", lock_id)
+                await self.on_acquired(lock_id)
+
+    async def _open_connection(self) -> AsyncConnection:
+        """Returns a new autocommit connection that detects dead peers within seconds."""
+        connection = await engine.connect()
+        await connection.execution_options(isolation_level="AUTOCOMMIT")
+        keepalive_seconds = max(int(self._check_interval.total_seconds()), 1)
+        for setting in ["tcp_keepalives_idle", "tcp_keepalives_interval"]:
+            await connection.execute(text(f"set {setting} = {keepalive_seconds}"))
+        await connection.execute(text("set tcp_keepalives_count = 3"))
+        return connection
+
+    async def _close_connection(self) -> None:
+        """Closes the connection, which releases the locks.
+
+        The connection is invalidated instead of being returned to the pool, so the locks aren't kept by it.
+
+        """
+        released_lock_ids = set(self.held_lock_ids)
+        self.held_lock_ids.clear()
+        if released_lock_ids:
+            try:
+                await self.on_released(released_lock_ids)
+            except Exception:  # pylint: disable=W0718
+                logger.exception("Failed to stop work of released locks %s", released_lock_ids)
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        try:
+            await connection.invalidate()
+            await connection.close()
+        except Exception:  # pylint: disable=W0718
+            logger.exception("Failed to close connection of leader election")
@@ -1,10 +1,27 @@
-from database.schemas import DatabaseReadSchema
+from pydantic import BaseModel
 
 
-class ScrapingTask(DatabaseReadSchema):
-    """Scraping task message."""
+class TriggerTask(BaseModel):
+    """Trigger task message."""
+
+    monitoring_ids: list[int]
+    shard: int = 0
+
+
+class ScrapingSubscription(BaseModel):
+    """Monitoring run served by a scraping task."""
 
     monitoring_id: int
-    monitoring_url: str
     monitoring_run_id: int
+
+
+class ScrapingTask(BaseModel):
+    """Scraping task message.
+
+    One task crawls the URL once for all monitorings subscribed to it.
+
+    """
+
+    monitoring_url: str
     marketplace_name: str
+    subscriptions: list[ScrapingSubscription]
@@ -1,5 +1,19 @@
 from faststream.rabbit import RabbitQueue
 
-TRIGGER_SCRAPING_TASKS_QUEUE = RabbitQueue("trigger_scraping_tasks", durable=True)
-SCRAPING_TASKS_QUEUE = RabbitQueue("scraping_tasks", durable=True)
+SCRAPING_TASKS_MAX_PRIORITY = 10
+
+TRIGGER_SCRAPING_TASKS_QUEUE_NAME = "trigger_scraping_tasks"
+SCRAPING_TASKS_QUEUE = RabbitQueue(
+    "scraping_tasks", durable=True, arguments={"x-max-priority": SCRAPING_TASKS_MAX_PRIORITY}
+)
 SCRAPING_RESULTS_QUEUE = RabbitQueue("scraping_results", durable=True)
+
+
+def get_trigger_scraping_tasks_queue(shard: int) -> RabbitQueue:
+    """Returns queue of triggers of the shard. It's consumed only by the leader of the shard.
+
+    Args:
+        shard (int): Trigger shard.
+
+    """
+    return RabbitQueue(f"{TRIGGER_SCRAPING_TASKS_QUEUE_NAME}.{shard}", durable=True)
@@ -0,0 +1,49 @@
+import time
+
+
+class TokenBucket:
+    """Token bucket rate limiter.
+
+    The bucket holds up to `capacity` tokens and is refilled at `rate` tokens per second.
+    Each admitted action takes one token, actions are not admitted while the bucket is empty.
+
+    Args:
+        rate (float): Number of tokens added per second.
+        capacity (float): Maximum number of tokens.
+
+    """
+
+    _rate: float
+    _capacity: float
+    _tokens: float
+    _updated_at: float
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def acquire(self) -> bool:
+        """Takes a token if available and returns whether it was taken."""
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def get_wait_time(self, position: int) -> float:
+        """Returns number of seconds until the bucket has a token for the action waiting at `position`.
+
+        Args:
+            position (int): Position of the action among the waiting ones, starting from 1.
+
+        """
+        self._refill()
+        return max((position - self._tokens) / self._rate, 0)
+
+    def _refill(self) -> None:
+        """Adds tokens for the time passed since the previous refill."""
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._updated_at) * self._rate, self._capacity)
+        self._updated_at = now
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy import case, func, or_, select, update
+
+from database import get_database
+from database.enums import MonitoringRunStatus
+from database.models import Monitoring, MonitoringRun
+from database.schemas import DatabaseReadSchema, MonitoringRead
+from settings import TasksSettings
+from tasks.scheduler import schedule_next_run
+
+logger = logging.getLogger(__name__)
+
+
+class ReapedRun(DatabaseReadSchema):
+    """Monitoring run marked as failed by the reaper."""
+
+    monitoring_run_id: int
+    monitoring_id: int
+
+
+class StaleRunReaper:
+    """Reaper of monitoring runs abandoned by workers.
+
+    Running runs are heartbeated by workers, so a running run without a heartbeat for `run_heartbeat_timeout`
+    is considered abandoned (e.g. the worker was killed). A queued run not picked up for `run_queued_timeout`
+    is considered lost. Such runs are marked as failed in bulk, and their monitorings are re-scheduled
+    the same way as after a failed run.
+
+    Args:
+        settings (TasksSettings): Tasks settings with reaper interval, run timeouts and number of trigger shards.
+        shards (list[int] | None): Shards to reap. If not provided, all shards are reaped. Default is None.
+
+    """
+
+    _settings: TasksSettings
+    _shards: list[int]
+
+    def __init__(self, settings: TasksSettings, shards: list[int] | None = None) -> None:
+        self._settings = settings
+        self._shards = shards if shards is not None else list(range(settings.trigger_shards))
+
+    async def run(self) -> None:
+        """Runs the reaper loop."""
+        while True:
+            try:
+                await self.reap()
+            except Exception:  # pylint: disable=W0718
+                logger.exception("Failed to reap stale runs")
+            await asyncio.sleep(self._settings.reaper_interval)
+
+    async def reap(self) -> list[ReapedRun]:
+        """Marks stale runs as failed and re-schedules their monitorings.
+
+        Returns:
+            list[ReapedRun]: Reaped runs.
+
+        """
+        heartbeat_timeout = timedelta(seconds=self._settings.run_heartbeat_timeout)
+        queued_timeout = timedelta(seconds=self._settings.run_queued_timeout)
+        reaped_runs = (
+            update(MonitoringRun)
+            .where(
+                or_(
+                    (MonitoringRun.status == MonitoringRunStatus.RUNNING)
+                    & (MonitoringRun.updated_at < func.now() - heartbeat_timeout),  # pylint: disable=E1102
+                    (MonitoringRun.status == MonitoringRunStatus.QUEUED)
+                    & (MonitoringRun.updated_at < func.now() - queued_timeout),  # pylint: disable=E1102
+                ),
+                (MonitoringRun.monitoring_id % self._settings.trigger_shards).in_(self._shards),
+            )
+            .values(
+                status=MonitoringRunStatus.FAILED,
+                error=case(
+                    (MonitoringRun.status == MonitoringRunStatus.RUNNING, "Reaped: no heartbeat from worker"),
+                    else_="Reaped: not picked up from queue",
+                ),
+            )
+            .returning(MonitoringRun.id, MonitoringRun.monitoring_id)
+            .cte("reaped_runs")
+        )
+
+        async with get_database() as database:
+            runs = await database.get_all_by_query(
+                query=select(reaped_runs.c.id.label("monitoring_run_id"), reaped_runs.c.monitoring_id),
+                read_schema=ReapedRun,
+            )
+            if runs:
+                monitorings = await database.get_all(
+                    model=Monitoring,
+                    filters=[
+                        Monitoring.id.in_({run.monitoring_id for run in runs}),
+                        Monitoring.next_run_at.is_(None),
+                    ],
+                    read_schema=MonitoringRead,
+                )
+                for monitoring in monitorings:
+                    await schedule_next_run(database, monitoring, succeeded=False)
+
+        if runs:
+            logger.warning("Reaped %s stale runs: %s", len(runs), [run.monitoring_run_id for run in runs])
+        return runs
@@ -1,2 +1,4 @@
+from .results import router as results_router
 from .scraping import router as scraping_router
+from .trigger import leader as trigger_leader
 from .trigger import router as trigger_router
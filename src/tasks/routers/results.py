@@ -0,0 +1,86 @@
+from typing import Annotated
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+from faststream import Depends, Logger
+from faststream.rabbit import RabbitRouter
+from sqlalchemy import select
+
+from bot.utils.adverts import send_advert_message
+from database import get_database
+from database.models import Advert, Monitoring, MonitoringRun, User
+from database.schemas import (
+    AdvertCreate,
+    AdvertRead,
+    AdvertUpdate,
+    MonitoringRead,
+    MonitoringRunRead,
+    MonitoringUpdate,
+    UserRead,
+)
+from tasks.dependencies import get_bot
+from tasks.queues import SCRAPING_RESULTS_QUEUE
+
+router = RabbitRouter()
+
+
+@router.subscriber(SCRAPING_RESULTS_QUEUE)
+async def process_scraping_result(
+    scraped_advert: AdvertCreate, logger: Logger, bot: Annotated[Bot, Depends(get_bot)]
+) -> None:
+    """Processes scraping result.
+
+    If the user has blocked the bot, all monitorings of the user are disabled, so they are not crawled anymore.
+
+    Args:
+        scraped_advert (AdvertCreate): Scraped advert.
+        logger (Logger): FastStream logger.
+        bot (Bot): Telegram bot.
+
+    """
+    async with get_database() as database:
+        advert = await database.create(
+            model=Advert, data=scraped_advert, update_on_conflict=True, read_schema=AdvertRead
+        )
+        first_monitoring_run = await database.get(
+            model=MonitoringRun,
+            filters=[MonitoringRun.monitoring_id == advert.monitoring_id],
+            order_by=[MonitoringRun.created_at.asc()],
+            read_schema=MonitoringRunRead,
+        )
+
+    if not first_monitoring_run:
+        logger.error(f"Monitoring run for advert {advert.id} not found")
+        return
+
+    if advert.monitoring_run_id != first_monitoring_run.id and not advert.sent_to_user:
+        async with get_database() as database:
+            user = await database.get_by_query(
+                query=select(User)
+                .join(Monitoring, Monitoring.user_id == User.id)
+                .where(Monitoring.id == advert.monitoring_id),
+                by_mappings=False,
+                read_schema=UserRead,
+            )
+        if user is None:
+            logger.error(f"User for advert {advert.id} not found")
+            return
+        logger.info(f"Sending advert {advert.id} to user")
+        try:
+            await send_advert_message(advert, user, bot)
+        except TelegramForbiddenError:
+            async with get_database() as database:
+                disabled_monitorings = await database.update_all(
+                    model=Monitoring,
+                    data=MonitoringUpdate(enabled=False),
+                    filters=[Monitoring.user_id == user.id, Monitoring.enabled.is_(True)],
+                    read_schema=MonitoringRead,
+                )
+            logger.warning(f"User {user.id} has blocked the bot, disabled {len(disabled_monitorings)} monitorings")
+
+    async with get_database() as database:
+        await database.update(
+            model=Advert,
+            data=AdvertUpdate(sent_to_user=True),
+            filters=[Advert.id == advert.id],
+        )
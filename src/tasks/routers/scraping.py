@@ -1,126 +1,194 @@
+import asyncio
 import traceback
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Annotated
 
-from aiogram import Bot
-from faststream import Depends, Logger
+from faststream import Logger
 from faststream.rabbit import RabbitRouter
-from sqlalchemy import select
 
-from bot.utils.adverts import send_advert_message
 from database import get_database
 from database.enums import MonitoringRunStatus
-from database.models import Advert, Monitoring, MonitoringRun, User
-from database.schemas import (
-    AdvertCreate,
-    AdvertRead,
-    AdvertUpdate,
-    MonitoringRunRead,
-    MonitoringRunUpdate,
-    UserRead,
+from database.models import Monitoring, MonitoringRun
+from database.schemas import MonitoringRead, MonitoringRunRead, MonitoringRunUpdate
+from scrapers.concurrency import AimdConcurrencyController
+from scrapers.crawlers import (
+    MARKETPLACE_CRAWLERS_MAPPING,
+    MARKETPLACE_PROFILES,
+    BaseAdvertCrawler,
+    CrawlLimits,
 )
-from scrapers.crawlers import MARKETPLACE_CRAWLERS_MAPPING
-from tasks.dependencies import get_bot
+from settings import TasksSettings
+from tasks.circuit_breaker import SUCCEEDED_RUN_STATUSES
 from tasks.messages import ScrapingTask
-from tasks.queues import SCRAPING_RESULTS_QUEUE, SCRAPING_TASKS_QUEUE
+from tasks.queues import SCRAPING_TASKS_QUEUE
+from tasks.scheduler import schedule_next_run
 
+RUN_DEADLINE_GRACE = timedelta(seconds=30)
+
+tasks_settings = TasksSettings()
 router = RabbitRouter()
+concurrency_controllers = {
+    marketplace_name: AimdConcurrencyController(profile) for marketplace_name, profile in MARKETPLACE_PROFILES.items()
+}
 
 
-@router.subscriber(SCRAPING_TASKS_QUEUE)
-async def process_scraping_task(scraping_task: ScrapingTask, logger: Logger) -> None:
-    """Processes scraping task.
+async def heartbeat_monitoring_runs(monitoring_run_ids: list[int], interval: timedelta, logger: Logger) -> None:
+    """Periodically refreshes `updated_at` of the running monitoring runs, so the reaper doesn't fail them.
 
     Args:
-        scraping_task (ScrapingTask): Scraping task to process.
+        monitoring_run_ids (list[int]): Monitoring run IDs.
+        interval (timedelta): Interval between heartbeats.
         logger (Logger): FastStream logger.
 
     """
-    async with get_database() as database:
-        await database.update(
-            model=MonitoringRun,
-            data=MonitoringRunUpdate(status=MonitoringRunStatus.RUNNING),
-            filters=[MonitoringRun.id == scraping_task.monitoring_run_id],
-        )
+    while True:
+        await asyncio.sleep(interval.total_seconds())
+        try:
+            async with get_database() as database:
+                monitoring_runs = await database.update_all(
+                    model=MonitoringRun,
+                    data=MonitoringRunUpdate(status=MonitoringRunStatus.RUNNING),
+                    filters=[
+                        MonitoringRun.id.in_(monitoring_run_ids),
+                        MonitoringRun.status == MonitoringRunStatus.RUNNING,
+                    ],
+                    read_schema=MonitoringRunRead,
+                )
+        except Exception:  # pylint: disable=W0718
+            logger.error(f"Failed to heartbeat monitoring runs {monitoring_run_ids}: {traceback.format_exc()}")
+            continue
+        if not monitoring_runs:
+            logger.warning(f"Monitoring runs {monitoring_run_ids} are not running anymore, stopping heartbeat")
+            return
 
-    log_file_dir = Path("./storage/logs/")
-    log_file_dir.mkdir(parents=True, exist_ok=True)
-    log_file = log_file_dir / f"{scraping_task.monitoring_run_id}.log"
 
-    crawler_cls = MARKETPLACE_CRAWLERS_MAPPING[scraping_task.marketplace_name]
-    crawler = crawler_cls(
-        monitoring_id=scraping_task.monitoring_id,
-        monitoring_run_id=scraping_task.monitoring_run_id,
-        monitoring_url=scraping_task.monitoring_url,
-        log_file=log_file,
-    )
+async def run_crawler(
+    crawler: BaseAdvertCrawler, deadline: timedelta, monitoring_run_ids: list[int], logger: Logger
+) -> tuple[MonitoringRunStatus, str | None]:
+    """Runs the crawler while heartbeating its monitoring runs, then releases it.
 
-    start_time = datetime.now()
+    Args:
+        crawler (BaseAdvertCrawler): Crawler to run.
+        deadline (timedelta): Deadline of the crawl. The crawl is cancelled `RUN_DEADLINE_GRACE` after it.
+        monitoring_run_ids (list[int]): Monitoring run IDs served by the crawl.
+        logger (Logger): FastStream logger.
+
+    Returns:
+        tuple[MonitoringRunStatus, str | None]: Status of the runs and the error, if any.
+
+    """
+    heartbeat = asyncio.create_task(
+        heartbeat_monitoring_runs(monitoring_run_ids, timedelta(seconds=tasks_settings.run_heartbeat_interval), logger)
+    )
     try:
-        await crawler.run()
-        status = MonitoringRunStatus.SUCCESS
-    except Exception:  # pylint: disable=W0718
+        await asyncio.wait_for(crawler.run(), timeout=(deadline + RUN_DEADLINE_GRACE).total_seconds())
+        return MonitoringRunStatus.PARTIAL if crawler.truncated else MonitoringRunStatus.SUCCESS, None
+    except TimeoutError:
+        logger.warning(f"Crawl of {crawler.monitoring_url} exceeded its deadline and was cancelled")
+        return MonitoringRunStatus.TIMEOUT, f"Cancelled after {deadline + RUN_DEADLINE_GRACE}"
+    except Exception as exc:  # pylint: disable=W0718
         logger.error(f"Error occurred during scraping: {traceback.format_exc()}")
-        status = MonitoringRunStatus.FAILED
+        return MonitoringRunStatus.FAILED, repr(exc)[:500]
+    finally:
+        heartbeat.cancel()
+        await crawler.close()
+
+
+async def finish_monitoring_runs(
+    scraping_task: ScrapingTask, monitoring_run_ids: list[int], data: MonitoringRunUpdate, logger: Logger
+) -> None:
+    """Records the result of the crawl to its running monitoring runs and schedules their next runs.
+
+    Args:
+        scraping_task (ScrapingTask): Processed scraping task.
+        monitoring_run_ids (list[int]): Monitoring run IDs served by the crawl.
+        data (MonitoringRunUpdate): Result of the crawl.
+        logger (Logger): FastStream logger.
 
+    """
     async with get_database() as database:
-        await database.update(
+        finished_monitoring_runs = await database.update_all(
             model=MonitoringRun,
-            data=MonitoringRunUpdate(
-                log_file=str(log_file),
-                duration=datetime.now() - start_time,
-                status=status,
-            ),
-            filters=[MonitoringRun.id == scraping_task.monitoring_run_id],
+            data=data,
+            filters=[
+                MonitoringRun.id.in_(monitoring_run_ids),
+                MonitoringRun.status == MonitoringRunStatus.RUNNING,
+            ],
+            read_schema=MonitoringRunRead,
+        )
+        if len(finished_monitoring_runs) < len(monitoring_run_ids):
+            logger.warning(
+                f"{len(monitoring_run_ids) - len(finished_monitoring_runs)} monitoring runs of "
+                f"{scraping_task.monitoring_url} were reaped before they finished"
+            )
+        monitorings = await database.get_all(
+            model=Monitoring,
+            filters=[Monitoring.id.in_([monitoring_run.monitoring_id for monitoring_run in finished_monitoring_runs])],
+            read_schema=MonitoringRead,
         )
+        for monitoring in monitorings:
+            await schedule_next_run(database, monitoring, data.status in SUCCEEDED_RUN_STATUSES)
 
 
-@router.subscriber(SCRAPING_RESULTS_QUEUE)
-async def process_scraping_result(
-    scraped_advert: AdvertCreate, logger: Logger, bot: Annotated[Bot, Depends(get_bot)]
-) -> None:
-    """Processes scraping result.
+@router.subscriber(SCRAPING_TASKS_QUEUE)
+async def process_scraping_task(scraping_task: ScrapingTask, logger: Logger) -> None:
+    """Processes scraping task.
+
+    The URL is crawled once for all subscribed monitorings, each of them gets its own run bookkeeping.
+    Runs that are not queued anymore (e.g. reaped) are skipped.
+
+    The crawl stops requesting next pages at the page cap or the deadline of the marketplace, and such runs
+    are recorded as partial. Adverts are published by the pipelines as soon as they are scraped, so they are kept.
+    A crawl that is still running `RUN_DEADLINE_GRACE` after the deadline is cancelled and recorded as timed out.
 
     Args:
-        scraped_advert (AdvertCreate): Scraped advert.
+        scraping_task (ScrapingTask): Scraping task to process.
         logger (Logger): FastStream logger.
-        bot (Bot): Telegram bot.
 
     """
     async with get_database() as database:
-        advert = await database.create(
-            model=Advert, data=scraped_advert, update_on_conflict=True, read_schema=AdvertRead
-        )
-        first_monitoring_run = await database.get(
+        monitoring_runs = await database.update_all(
             model=MonitoringRun,
-            filters=[MonitoringRun.monitoring_id == advert.monitoring_id],
-            order_by=[MonitoringRun.created_at.asc()],
+            data=MonitoringRunUpdate(status=MonitoringRunStatus.RUNNING),
+            filters=[
+                MonitoringRun.id.in_([subscription.monitoring_run_id for subscription in scraping_task.subscriptions]),
+                MonitoringRun.status == MonitoringRunStatus.QUEUED,
+            ],
             read_schema=MonitoringRunRead,
         )
-
-    if not first_monitoring_run:
-        logger.error(f"Monitoring run for advert {advert.id} not found")
+    if not monitoring_runs:
+        logger.warning(f"Monitoring runs of {scraping_task.monitoring_url} are not queued, skipping them")
         return
 
-    if advert.monitoring_run_id != first_monitoring_run.id and not advert.sent_to_user:
-        async with get_database() as database:
-            user = await database.get_by_query(
-                query=select(User)
-                .join(Monitoring, Monitoring.user_id == User.id)
-                .where(Monitoring.id == advert.monitoring_id),
-                by_mappings=False,
-                read_schema=UserRead,
-            )
-        if user is None:
-            logger.error(f"User for advert {advert.id} not found")
-            return
-        logger.info(f"Sending advert {advert.id} to user")
-        await send_advert_message(advert, user, bot)
+    monitoring_ids = {
+        monitoring_run.id: monitoring_run.monitoring_id
+        for monitoring_run in sorted(monitoring_runs, key=lambda monitoring_run: monitoring_run.id)
+    }
+    monitoring_run_ids = list(monitoring_ids)
 
-    async with get_database() as database:
-        await database.update(
-            model=Advert,
-            data=AdvertUpdate(sent_to_user=True),
-            filters=[Advert.id == advert.id],
-        )
+    log_file_dir = Path("./storage/logs/")
+    log_file_dir.mkdir(parents=True, exist_ok=True)
+    log_file = log_file_dir / f"{monitoring_run_ids[0]}.log"
+
+    crawler_cls = MARKETPLACE_CRAWLERS_MAPPING[scraping_task.marketplace_name]
+    profile = MARKETPLACE_PROFILES[scraping_task.marketplace_name]
+    deadline = timedelta(seconds=profile.run_deadline)
+    crawler = crawler_cls(
+        monitoring_ids=monitoring_ids,
+        monitoring_url=scraping_task.monitoring_url,
+        log_file=log_file,
+        limits=CrawlLimits(
+            deadline=deadline,
+            max_pages=profile.max_pages,
+            concurrency_controller=concurrency_controllers[scraping_task.marketplace_name],
+        ),
+    )
+
+    start_time = datetime.now()
+    status, error = await run_crawler(crawler, deadline, monitoring_run_ids, logger)
+    await finish_monitoring_runs(
+        scraping_task,
+        monitoring_run_ids,
+        MonitoringRunUpdate(log_file=str(log_file), duration=datetime.now() - start_time, status=status, error=error),
+        logger,
+    )
@@ -1,85 +1,646 @@
 import asyncio
+import math
+from collections import defaultdict
+from datetime import UTC, datetime, timedelta
+from itertools import batched
 
 from faststream import Logger
-from faststream.rabbit import RabbitRouter
-from sqlalchemy import exists, func, not_, or_, select
+from faststream.exceptions import NackMessage
+from faststream.rabbit import RabbitBroker, RabbitRouter
+from faststream.rabbit.subscriber.asyncapi import AsyncAPISubscriber
+from sqlalchemy import (
+    BigInteger,
+    BindParameter,
+    DateTime,
+    Select,
+    any_,
+    bindparam,
+    cast,
+    column,
+    exists,
+    func,
+    insert,
+    not_,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import literal
 
 from database import get_database
 from database.enums import MonitoringRunStatus
 from database.models import Marketplace, Monitoring, MonitoringRun
-from database.schemas import MonitoringRead, MonitoringRunCreate, MonitoringRunUpdate
-from tasks.messages import ScrapingTask
-from tasks.queues import SCRAPING_TASKS_QUEUE, TRIGGER_SCRAPING_TASKS_QUEUE
+from database.schemas import DatabaseReadSchema
+from scrapers.crawlers import MARKETPLACE_PROFILES
+from settings import TasksSettings
+from tasks.circuit_breaker import CircuitBreaker, CircuitBreakerProfile
+from tasks.leader import LeaderElection
+from tasks.messages import ScrapingSubscription, ScrapingTask, TriggerTask
+from tasks.queues import (
+    SCRAPING_TASKS_MAX_PRIORITY,
+    SCRAPING_TASKS_QUEUE,
+    get_trigger_scraping_tasks_queue,
+)
+from tasks.rate_limiter import TokenBucket
+from tasks.scheduler import get_canonical_url
 
+DUE_TIME_TOLERANCE = timedelta(seconds=5)
+TRIGGER_LEADER_LOCK_ID = 8_126_743_000
+PRIORITY_BASE_INTERVAL = timedelta(minutes=5)
+PRIORITY_LATENESS_WEIGHT = 4
+USER_CRAWL_BUDGET_WINDOW = timedelta(hours=1)
+DEFAULT_RUN_SECONDS = 10.0
+PUBLISH_BATCH_SIZE = 1000
+CIRCUIT_BREAKER_PROFILE = CircuitBreakerProfile(
+    failure_rate=0.5,
+    min_runs=10,
+    window=timedelta(minutes=10),
+    probe_interval=timedelta(minutes=1),
+    check_interval=timedelta(seconds=15),
+)
+
+
+class TriggerLeaderElection(LeaderElection):
+    """Leader election of trigger shards that consumes trigger queues of the shards led by the process.
+
+    Standbys don't consume trigger queues at all, so triggers are not bounced between them until they reach
+    the leader. A queue is consumed from the moment its shard's lock is acquired, and stops being consumed,
+    waiting for in-flight triggers, before the lock is released.
+
+    Attributes:
+        broker (RabbitBroker | None): Broker to consume trigger queues with, must be set before `start`.
+
+    """
+
+    broker: RabbitBroker | None
+
+    _subscribers: dict[int, AsyncAPISubscriber]
+
+    def __init__(self, lock_ids: list[int], max_locks: int, check_interval: timedelta) -> None:
+        super().__init__(lock_ids, max_locks, check_interval)
+        self.broker = None
+        self._subscribers = {}
+
+    async def on_acquired(self, lock_id: int) -> None:
+        """Starts consuming trigger queue of the shard of the lock.
+
+        Args:
+            lock_id (int): Advisory lock key.
+
+        Raises:
+            ValueError: If the broker is not set.
+
+        """
+        if self.broker is None:
+            raise ValueError("Broker must be set before leader election is started")
+        shard = lock_id - TRIGGER_LEADER_LOCK_ID
+        subscriber = self._subscribers.get(shard)
+        if subscriber is None:
+            subscriber = self.broker.subscriber(get_trigger_scraping_tasks_queue(shard))
+            subscriber(trigger_scraping_task)
+            self.broker.setup_subscriber(subscriber)
+            self._subscribers[shard] = subscriber
+        await subscriber.start()
+
+    async def on_released(self, lock_ids: set[int]) -> None:
+        """Stops consuming trigger queues of the shards of the locks.
+
+        Args:
+            lock_ids (set[int]): Advisory lock keys.
+
+        """
+        for lock_id in lock_ids:
+            if subscriber := self._subscribers.get(lock_id - TRIGGER_LEADER_LOCK_ID):
+                await subscriber.close()
+
+
+tasks_settings = TasksSettings()
 router = RabbitRouter()
 scraping_task_publisher = router.publisher(SCRAPING_TASKS_QUEUE, persist=True)
-lock = asyncio.Lock()
+leader = TriggerLeaderElection(
+    lock_ids=[TRIGGER_LEADER_LOCK_ID + shard for shard in range(tasks_settings.trigger_shards)],
+    max_locks=tasks_settings.trigger_max_shards_per_worker,
+    check_interval=timedelta(seconds=tasks_settings.trigger_leader_check_interval),
+)
+locks: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+pending_monitoring_ids: defaultdict[int, set[int]] = defaultdict(set)
+marketplace_buckets: defaultdict[int, dict[str, TokenBucket]] = defaultdict(
+    lambda: {
+        marketplace_name: TokenBucket(
+            rate=profile.runs_per_minute / 60 / tasks_settings.trigger_shards,
+            capacity=max(profile.runs_per_minute / tasks_settings.trigger_shards, 1),
+        )
+        for marketplace_name, profile in MARKETPLACE_PROFILES.items()
+    }
+)
+circuit_breakers = {
+    marketplace_name: CircuitBreaker(marketplace_name=marketplace_name, profile=CIRCUIT_BREAKER_PROFILE)
+    for marketplace_name in MARKETPLACE_PROFILES
+}
+
+
+class DueMonitoring(DatabaseReadSchema):
+    """Due monitoring waiting for admission."""
+
+    id: int
+    user_id: int
+    url: str
+    marketplace_name: str
+    run_interval: timedelta
+    next_run_at: datetime
+    user_crawl_seconds: float
+    user_runs: int
+
+    def get_user_run_seconds(self) -> float:
+        """Returns average crawl seconds of the user's runs within the budget window."""
+        return self.user_crawl_seconds / self.user_runs if self.user_runs else DEFAULT_RUN_SECONDS
+
+
+class QueuedRun(DatabaseReadSchema):
+    """Queued monitoring run to be published as a part of scraping task."""
+
+    monitoring_id: int
+    monitoring_url: str
+    monitoring_run_id: int
+    marketplace_name: str
+
+
+class ReleasedMonitoring(DatabaseReadSchema):
+    """Monitoring made due again after its scraping task was not published."""
+
+    monitoring_id: int
+
+
+def get_ids_param(name: str, ids: list[int]) -> BindParameter:
+    """Returns IDs bound as a single array parameter.
+
+    Expanding `IN` lists bind one parameter per ID, so large triggers would exceed the limit of query parameters.
+
+    Args:
+        name (str): Name of the parameter.
+        ids (list[int]): IDs to bind.
+
+    """
+    return bindparam(name, ids, type_=ARRAY(BigInteger()))
+
+
+def get_user_quota_delay(crawl_seconds: float, budget: int, run_interval: timedelta) -> timedelta:
+    """Returns delay after which crawl seconds of the user are expected to fit in the budget again.
+
+    Runs are assumed to be spread evenly over the budget window, so the excess leaves the window proportionally.
+    The delay is at least the run interval of the monitoring, so monitorings of users at or just over the budget
+    are not re-triggered right away over and over.
+
+    Args:
+        crawl_seconds (float): Crawl seconds of the user within the budget window. Must be positive.
+        budget (int): Crawl seconds budget of the user within the budget window.
+        run_interval (timedelta): Run interval of the monitoring.
+
+    """
+    return max(USER_CRAWL_BUDGET_WINDOW * (1 - budget / crawl_seconds), run_interval)
+
+
+def get_scraping_task_priority(run_interval: timedelta, lateness: timedelta) -> int:
+    """Returns priority of scraping task in the queue.
+
+    Monitorings with shorter run intervals get higher priority, one level less per each doubling of the interval
+    above `PRIORITY_BASE_INTERVAL`. Late monitorings are raised by `PRIORITY_LATENESS_WEIGHT` levels per each
+    run interval they are late.
+
+    Args:
+        run_interval (timedelta): Monitoring run interval.
+        lateness (timedelta): Time passed since the monitoring became due.
+
+    """
+    interval_priority = SCRAPING_TASKS_MAX_PRIORITY - math.log2(max(run_interval / PRIORITY_BASE_INTERVAL, 1))
+    lateness_priority = max(lateness / run_interval, 0) * PRIORITY_LATENESS_WEIGHT
+    return min(max(round(interval_priority + lateness_priority), 0), SCRAPING_TASKS_MAX_PRIORITY)
+
+
+async def publish_scraping_tasks(scraping_tasks: list[tuple[ScrapingTask, int]], logger: Logger) -> list[ScrapingTask]:
+    """Publishes scraping tasks with pipelined publisher confirms.
+
+    Tasks are published concurrently in batches of `PUBLISH_BATCH_SIZE`, so confirms of a batch are awaited together
+    instead of one broker round trip per task. A task is dispatched only when its confirm arrives.
+
+    Args:
+        scraping_tasks (list[tuple[ScrapingTask, int]]): Scraping tasks with their priorities, in publishing order.
+        logger (Logger): FastStream logger.
+
+    Returns:
+        list[ScrapingTask]: Scraping tasks that were not confirmed by the broker.
+
+    """
+    unconfirmed_tasks = []
+    for batch in batched(scraping_tasks, PUBLISH_BATCH_SIZE):
+        results = await asyncio.gather(
+            *(scraping_task_publisher.publish(scraping_task, priority=priority) for scraping_task, priority in batch),
+            return_exceptions=True,
+        )
+        for (scraping_task, _), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to publish scraping task of {scraping_task.monitoring_url}: {result!r}")
+                unconfirmed_tasks.append(scraping_task)
+    return unconfirmed_tasks
+
+
+async def release_unpublished_runs(scraping_tasks: list[ScrapingTask]) -> None:
+    """Marks runs of unpublished scraping tasks as failed and makes their monitorings due again.
+
+    The scheduler is notified about the changed `next_run_at`, so the monitorings are triggered again right away.
+
+    Args:
+        scraping_tasks (list[ScrapingTask]): Scraping tasks that were not published.
+
+    """
+    released_runs = (
+        update(MonitoringRun)
+        .where(
+            MonitoringRun.id
+            == any_(
+                get_ids_param(
+                    "monitoring_run_ids",
+                    [
+                        subscription.monitoring_run_id
+                        for scraping_task in scraping_tasks
+                        for subscription in scraping_task.subscriptions
+                    ],
+                )
+            ),
+            MonitoringRun.status == MonitoringRunStatus.QUEUED,
+        )
+        .values(status=MonitoringRunStatus.FAILED, error="Not published to the broker")
+        .returning(MonitoringRun.monitoring_id)
+        .cte("released_runs")
+    )
+    released_monitorings = (
+        update(Monitoring)
+        .where(Monitoring.id == released_runs.c.monitoring_id, Monitoring.next_run_at.is_(None))
+        .values(next_run_at=func.now())  # pylint: disable=E1102
+        .returning(Monitoring.id)
+        .cte("released_monitorings")
+    )
+    async with get_database() as database:
+        await database.get_all_by_query(
+            query=select(released_monitorings.c.id.label("monitoring_id")), read_schema=ReleasedMonitoring
+        )
 
 
-@router.subscriber(TRIGGER_SCRAPING_TASKS_QUEUE)
-async def trigger_scraping_task(logger: Logger) -> None:
+async def trigger_scraping_task(trigger_task: TriggerTask, logger: Logger) -> None:
     """Triggers scraping task.
 
+    Monitorings are split into shards by `monitoring_id % trigger_shards`, each shard has its own trigger queue
+    consumed only by the shard's leader (see `TriggerLeaderElection`). Triggers delivered right before
+    the leadership was lost are returned to the queue. Shards owned by the same worker are processed concurrently.
+    Triggers that arrive while another one of the same shard is in flight are coalesced into the next trigger.
+
     Args:
+        trigger_task (TriggerTask): Trigger task with IDs of due monitorings.
         logger (Logger): FastStream logger.
 
+    Raises:
+        NackMessage: If the current worker is not the leader of the trigger's shard.
+
     """
-    async with lock:
-        async with get_database() as database:
-            monitorings = await database.get_all(
-                model=Monitoring,
-                filters=[
-                    Monitoring.enabled.is_(True),
-                    not_(
-                        exists(
-                            select(literal(1)).where(
-                                MonitoringRun.monitoring_id == Monitoring.id,
-                                MonitoringRun.status.notin_([MonitoringRunStatus.SUCCESS, MonitoringRunStatus.FAILED]),
-                            )
-                        )
-                    ),
-                    or_(
-                        not_(exists(select(literal(1)).where(MonitoringRun.monitoring_id == Monitoring.id))),
-                        (
-                            select(func.max(MonitoringRun.created_at))
-                            .where(MonitoringRun.monitoring_id == Monitoring.id)
-                            .as_scalar()
-                            + Monitoring.run_interval
-                        )
-                        <= func.now(),  # pylint: disable=E1102
-                    ),
-                ],
-                read_schema=MonitoringRead,
+    shard = trigger_task.shard
+    if not leader.is_leader(TRIGGER_LEADER_LOCK_ID + shard):
+        raise NackMessage(requeue=True)
+
+    pending_monitoring_ids[shard].update(trigger_task.monitoring_ids)
+    if locks[shard].locked():
+        logger.info(f"Coalesced {len(trigger_task.monitoring_ids)} monitorings into the next trigger of shard {shard}")
+        return
+
+    async with locks[shard]:
+        while pending_monitoring_ids[shard]:
+            monitoring_ids = list(pending_monitoring_ids[shard])
+            pending_monitoring_ids[shard].clear()
+            await create_scraping_tasks(monitoring_ids, shard, logger)
+
+
+async def create_scraping_tasks(monitoring_ids: list[int], shard: int, logger: Logger) -> None:
+    """Creates and publishes scraping tasks for due monitorings.
+
+    Runs of due monitorings are created already queued and returned as scraping tasks by a single query.
+    Runs left in scheduled status (e.g. created via API) are queued by the same query.
+    Monitorings with queued runs get empty `next_run_at` until their runs are finished.
+
+    Runs of monitorings with the same marketplace and canonical URL are grouped into one scraping task,
+    so the URL is crawled once for all of them.
+
+    Scraping tasks are published with priority by run interval and lateness of their monitorings.
+    Runs created in scheduled status are requested manually, so they get the maximum priority.
+    Runs of tasks not confirmed by the broker are marked as failed and their monitorings are made due again.
+
+    Monitorings of users over their crawl budget are deferred, the rest are admitted in weighted fair queuing order
+    through circuit breakers and token buckets of their marketplaces (see `group_due_monitorings`,
+    `get_finish_tags` and `admit_due_monitoring_groups`).
+
+    Args:
+        monitoring_ids (list[int]): IDs of monitorings to check.
+        shard (int): Shard of the monitorings.
+        logger (Logger): FastStream logger.
+
+    """
+    due_monitorings = await get_due_monitorings(monitoring_ids, shard)
+    now = datetime.now(UTC)
+    due_monitoring_groups, deferred_monitorings = group_due_monitorings(due_monitorings, now)
+    finish_tags = get_finish_tags(due_monitoring_groups)
+    admitted_monitoring_ids, priorities, rate_limited_monitorings = await admit_due_monitoring_groups(
+        due_monitoring_groups, finish_tags, shard, now
+    )
+    deferred_monitorings.update(rate_limited_monitorings)
+
+    async with get_database() as database:
+        queued_monitoring_runs = await database.get_all_by_query(
+            query=get_queue_runs_query(admitted_monitoring_ids, deferred_monitorings, shard), read_schema=QueuedRun
+        )
+
+    scraping_tasks = get_scraping_tasks(queued_monitoring_runs)
+    unconfirmed_tasks = await publish_scraping_tasks(
+        [
+            (scraping_task, priorities.get(group_key, SCRAPING_TASKS_MAX_PRIORITY))
+            for group_key, scraping_task in sorted(scraping_tasks.items(), key=lambda item: finish_tags.get(item[0], 0))
+        ],
+        logger,
+    )
+    if unconfirmed_tasks:
+        await release_unpublished_runs(unconfirmed_tasks)
+
+    logger.info(
+        f"Published {len(scraping_tasks) - len(unconfirmed_tasks)} scraping tasks for {len(queued_monitoring_runs)} "
+        f"runs of shard {shard}, released {len(unconfirmed_tasks)} unconfirmed ones, "
+        f"deferred {len(deferred_monitorings)} rate limited, over quota or circuit broken monitorings"
+    )
+
+
+async def get_due_monitorings(monitoring_ids: list[int], shard: int) -> list[DueMonitoring]:
+    """Returns due monitorings of the shard with crawl usage of their users.
+
+    Crawl usage is the sum of `MonitoringRun.duration` of the user's runs within `USER_CRAWL_BUDGET_WINDOW`.
+
+    Args:
+        monitoring_ids (list[int]): IDs of monitorings to check.
+        shard (int): Shard of the monitorings.
+
+    """
+    monitoring_ids_param = get_ids_param("monitoring_ids", monitoring_ids)
+    user_crawl_usage = (
+        select(
+            Monitoring.user_id,
+            func.sum(func.extract("epoch", MonitoringRun.duration)).label("crawl_seconds"),  # pylint: disable=E1102
+            func.count(MonitoringRun.duration).label("runs"),  # pylint: disable=E1102
+        )
+        .join(Monitoring, Monitoring.id == MonitoringRun.monitoring_id)
+        .where(
+            Monitoring.user_id.in_(select(Monitoring.user_id).where(Monitoring.id == any_(monitoring_ids_param))),
+            MonitoringRun.created_at >= func.now() - USER_CRAWL_BUDGET_WINDOW,  # pylint: disable=E1102
+        )
+        .group_by(Monitoring.user_id)
+        .subquery()
+    )
+    async with get_database() as database:
+        return await database.get_all_by_query(
+            query=select(
+                Monitoring.id,
+                Monitoring.user_id,
+                Monitoring.url,
+                Marketplace.name.label("marketplace_name"),
+                Monitoring.run_interval,
+                Monitoring.next_run_at,
+                func.coalesce(user_crawl_usage.c.crawl_seconds, 0).label("user_crawl_seconds"),
+                func.coalesce(user_crawl_usage.c.runs, 0).label("user_runs"),
             )
+            .join(Marketplace, Marketplace.id == Monitoring.marketplace_id)
+            .outerjoin(user_crawl_usage, user_crawl_usage.c.user_id == Monitoring.user_id)
+            .where(
+                Monitoring.id == any_(monitoring_ids_param),
+                Monitoring.id % tasks_settings.trigger_shards == shard,
+                Monitoring.enabled.is_(True),
+                Monitoring.next_run_at <= func.now() + DUE_TIME_TOLERANCE,  # pylint: disable=E1102
+            )
+            .order_by(Monitoring.next_run_at),
+            read_schema=DueMonitoring,
+        )
 
-            for monitoring in monitorings:
-                await database.create(
-                    model=MonitoringRun,
-                    data=MonitoringRunCreate(monitoring_id=monitoring.id),
-                )
 
-            scraping_tasks = await database.get_all_by_query(
-                query=select(
-                    Monitoring.id.label("monitoring_id"),
-                    Monitoring.url.label("monitoring_url"),
-                    MonitoringRun.id.label("monitoring_run_id"),
-                    Marketplace.name.label("marketplace_name"),
-                )
-                .join(Marketplace, Marketplace.id == Monitoring.marketplace_id)
-                .join(MonitoringRun, MonitoringRun.monitoring_id == Monitoring.id)
-                .where(MonitoringRun.status == MonitoringRunStatus.SCHEDULED),
-                read_schema=ScrapingTask,
+def group_due_monitorings(
+    due_monitorings: list[DueMonitoring], now: datetime
+) -> tuple[dict[tuple[str, str], list[DueMonitoring]], dict[int, datetime]]:
+    """Groups due monitorings by marketplace and canonical URL, deferring monitorings of users over quota.
+
+    Monitorings of users that have spent their crawl seconds budget are deferred until the budget
+    is expected to be available again. Zero budget disables the quota.
+
+    Args:
+        due_monitorings (list[DueMonitoring]): Due monitorings.
+        now (datetime): Current time.
+
+    Returns:
+        tuple[dict[tuple[str, str], list[DueMonitoring]], dict[int, datetime]]: Groups of due monitorings
+            and deferred times of monitorings of users over quota.
+
+    """
+    user_crawl_budget = tasks_settings.user_crawl_seconds_per_hour
+    deferred_monitorings: dict[int, datetime] = {}
+    due_monitoring_groups: defaultdict[tuple[str, str], list[DueMonitoring]] = defaultdict(list)
+    for monitoring in due_monitorings:
+        if 0 < user_crawl_budget <= monitoring.user_crawl_seconds:
+            deferred_monitorings[monitoring.id] = now + get_user_quota_delay(
+                monitoring.user_crawl_seconds, user_crawl_budget, monitoring.run_interval
             )
+            continue
+        due_monitoring_groups[(monitoring.marketplace_name, get_canonical_url(monitoring.url))].append(monitoring)
+    return due_monitoring_groups, deferred_monitorings
+
+
+def get_finish_tags(due_monitoring_groups: dict[tuple[str, str], list[DueMonitoring]]) -> dict[tuple[str, str], float]:
+    """Returns weighted fair queuing finish tags of groups of due monitorings.
+
+    Each group gets a finish tag equal to the crawl seconds its user has already spent plus the estimated cost
+    of the user's groups up to this one. Groups are admitted and published in order of finish tags,
+    so heavy users are served after light ones instead of taking all workers.
+
+    Args:
+        due_monitoring_groups (dict[tuple[str, str], list[DueMonitoring]]): Groups of due monitorings.
+
+    """
+    finish_tags: dict[tuple[str, str], float] = {}
+    user_queued_seconds: defaultdict[int, float] = defaultdict(float)
+    for group_key, group_monitorings in due_monitoring_groups.items():
+        lightest_monitoring = min(group_monitorings, key=lambda monitoring: monitoring.user_crawl_seconds)
+        user_queued_seconds[lightest_monitoring.user_id] += lightest_monitoring.get_user_run_seconds()
+        finish_tags[group_key] = (
+            lightest_monitoring.user_crawl_seconds + user_queued_seconds[lightest_monitoring.user_id]
+        )
+    return finish_tags
 
-            for scraping_task in scraping_tasks:
-                await database.update(
-                    model=MonitoringRun,
-                    data=MonitoringRunUpdate(status=MonitoringRunStatus.QUEUED),
-                    filters=[MonitoringRun.id == scraping_task.monitoring_run_id],
-                )
 
-        for scraping_task in scraping_tasks:
-            await scraping_task_publisher.publish(scraping_task)
+async def admit_due_monitoring_groups(
+    due_monitoring_groups: dict[tuple[str, str], list[DueMonitoring]],
+    finish_tags: dict[tuple[str, str], float],
+    shard: int,
+    now: datetime,
+) -> tuple[list[int], dict[tuple[str, str], int], dict[int, datetime]]:
+    """Admits groups of due monitorings in order of their finish tags.
+
+    Groups of a marketplace whose circuit breaker is open (too many of its recent runs failed) are deferred
+    until the next probe slot, only one probe group per probe interval is dispatched. The breaker closes
+    once a probe run succeeds. The rest are admitted by the token bucket of their marketplace, one token
+    per group, and groups without a token are deferred until the bucket is expected to have one for them.
+
+    Args:
+        due_monitoring_groups (dict[tuple[str, str], list[DueMonitoring]]): Groups of due monitorings.
+        finish_tags (dict[tuple[str, str], float]): Finish tags of the groups.
+        shard (int): Shard of the monitorings.
+        now (datetime): Current time.
+
+    Returns:
+        tuple[list[int], dict[tuple[str, str], int], dict[int, datetime]]: IDs of admitted monitorings,
+            priorities of admitted groups and deferred times of the rest of monitorings.
+
+    """
+    for marketplace_name in {group_key[0] for group_key in due_monitoring_groups}:
+        if breaker := circuit_breakers.get(marketplace_name):
+            await breaker.refresh(now)
+
+    admitted_monitoring_ids: list[int] = []
+    priorities: dict[tuple[str, str], int] = {}
+    deferred_monitorings: dict[int, datetime] = {}
+    deferred_counts: defaultdict[str, int] = defaultdict(int)
+    for group_key in sorted(due_monitoring_groups, key=finish_tags.__getitem__):
+        group_monitorings = due_monitoring_groups[group_key]
+        marketplace_name = group_key[0]
+        breaker = circuit_breakers.get(marketplace_name)
+        if breaker is not None and not breaker.allow(now):
+            for monitoring in group_monitorings:
+                deferred_monitorings[monitoring.id] = breaker.get_retry_at(now)
+            continue
+        bucket = marketplace_buckets[shard].get(marketplace_name)
+        if bucket is None or bucket.acquire():
+            admitted_monitoring_ids.extend(monitoring.id for monitoring in group_monitorings)
+            priorities[group_key] = max(
+                get_scraping_task_priority(monitoring.run_interval, now - monitoring.next_run_at)
+                for monitoring in group_monitorings
+            )
+            continue
+        deferred_counts[marketplace_name] += 1
+        deferred_until = now + timedelta(seconds=bucket.get_wait_time(deferred_counts[marketplace_name]))
+        for monitoring in group_monitorings:
+            deferred_monitorings[monitoring.id] = deferred_until
+    return admitted_monitoring_ids, priorities, deferred_monitorings
 
-        logger.info(f"Published {len(scraping_tasks)} scraping tasks")
+
+def get_scraping_tasks(queued_runs: list[QueuedRun]) -> dict[tuple[str, str], ScrapingTask]:
+    """Returns scraping tasks with queued runs grouped by marketplace and canonical URL of their monitorings.
+
+    Args:
+        queued_runs (list[QueuedRun]): Queued runs.
+
+    """
+    scraping_tasks: dict[tuple[str, str], ScrapingTask] = {}
+    for queued_run in queued_runs:
+        group_key = (queued_run.marketplace_name, get_canonical_url(queued_run.monitoring_url))
+        scraping_task = scraping_tasks.setdefault(
+            group_key,
+            ScrapingTask(
+                monitoring_url=queued_run.monitoring_url,
+                marketplace_name=queued_run.marketplace_name,
+                subscriptions=[],
+            ),
+        )
+        scraping_task.subscriptions.append(
+            ScrapingSubscription(monitoring_id=queued_run.monitoring_id, monitoring_run_id=queued_run.monitoring_run_id)
+        )
+    return scraping_tasks
+
+
+def get_queue_runs_query(
+    admitted_monitoring_ids: list[int], deferred_monitorings: dict[int, datetime], shard: int
+) -> Select:
+    """Returns query that queues runs of admitted monitorings and scheduled runs of the shard.
+
+    The query creates queued runs of admitted monitorings, queues scheduled runs, empties `next_run_at`
+    of their monitorings and moves `next_run_at` of deferred monitorings. It returns the queued runs.
+
+    Monitorings with a scheduled run are neither given another run nor deferred, their scheduled run is queued
+    instead. Otherwise a monitoring would get two runs at once, or its row would be updated twice by the query.
+
+    Args:
+        admitted_monitoring_ids (list[int]): IDs of admitted monitorings.
+        deferred_monitorings (dict[int, datetime]): Deferred times of monitorings.
+        shard (int): Shard of the monitorings.
+
+    """
+    queued_status = cast(literal(MonitoringRunStatus.QUEUED.value), MonitoringRun.status.type)
+    has_no_scheduled_run = not_(
+        exists(
+            select(literal(1)).where(
+                MonitoringRun.monitoring_id == Monitoring.id,
+                MonitoringRun.status == MonitoringRunStatus.SCHEDULED,
+            )
+        )
+    )
+    admitted_monitorings = select(Monitoring.id, queued_status).where(
+        Monitoring.id == any_(get_ids_param("admitted_monitoring_ids", admitted_monitoring_ids)),
+        Monitoring.enabled.is_(True),
+        Monitoring.next_run_at <= func.now() + DUE_TIME_TOLERANCE,  # pylint: disable=E1102
+        has_no_scheduled_run,
+    )
+    created_runs = (
+        insert(MonitoringRun)
+        .from_select([MonitoringRun.monitoring_id, MonitoringRun.status], admitted_monitorings)
+        .returning(MonitoringRun.id, MonitoringRun.monitoring_id)
+        .cte("created_runs")
+    )
+    scheduled_runs = (
+        update(MonitoringRun)
+        .where(
+            MonitoringRun.status == MonitoringRunStatus.SCHEDULED,
+            MonitoringRun.monitoring_id % tasks_settings.trigger_shards == shard,
+        )
+        .values(status=MonitoringRunStatus.QUEUED)
+        .returning(MonitoringRun.id, MonitoringRun.monitoring_id)
+        .cte("scheduled_runs")
+    )
+    queued_runs = union_all(select(created_runs), select(scheduled_runs)).cte("queued_runs")
+    started_monitorings = (
+        update(Monitoring)
+        .where(Monitoring.id == queued_runs.c.monitoring_id)
+        .values(next_run_at=None, last_run_at=func.now())  # pylint: disable=E1102
+        .returning(Monitoring.id, Monitoring.url, Monitoring.marketplace_id)
+        .cte("started_monitorings")
+    )
+
+    query = (
+        select(
+            started_monitorings.c.id.label("monitoring_id"),
+            started_monitorings.c.url.label("monitoring_url"),
+            queued_runs.c.id.label("monitoring_run_id"),
+            Marketplace.name.label("marketplace_name"),
+        )
+        .select_from(queued_runs)
+        .join(started_monitorings, started_monitorings.c.id == queued_runs.c.monitoring_id)
+        .join(Marketplace, Marketplace.id == started_monitorings.c.marketplace_id)
+    )
+    if deferred_monitorings:
+        deferred_times = (
+            func.unnest(
+                get_ids_param("deferred_monitoring_ids", list(deferred_monitorings)),
+                bindparam(
+                    "deferred_next_run_ats", list(deferred_monitorings.values()), type_=ARRAY(DateTime(timezone=True))
+                ),
+            )
+            .table_valued(column("id", BigInteger()), column("next_run_at", DateTime(timezone=True)))
+            .render_derived(name="deferred_times")
+        )
+        deferred_monitorings_cte = (
+            update(Monitoring)
+            .where(Monitoring.id == deferred_times.c.id, has_no_scheduled_run)
+            .values(next_run_at=deferred_times.c.next_run_at)
+            .returning(Monitoring.id)
+            .cte("deferred_monitorings")
+        )
+        query = query.add_cte(deferred_monitorings_cte)
+    return query
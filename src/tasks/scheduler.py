@@ -0,0 +1,528 @@
+import asyncio
+import heapq
+import logging
+import math
+import zlib
+from datetime import UTC, datetime, time, timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from zoneinfo import ZoneInfo
+
+from faststream.rabbit import RabbitBroker
+from sqlalchemy import distinct, func, select, true
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from database import DatabaseProvider, get_database
+from database.enums import MonitoringRunStatus
+from database.models import Advert, Monitoring, MonitoringRun, User
+from database.provider import engine
+from database.schemas import (
+    DatabaseReadSchema,
+    MonitoringRead,
+    MonitoringScheduleUpdate,
+    UserRead,
+)
+from settings import TasksSettings
+from tasks.messages import TriggerTask
+from tasks.queues import get_trigger_scraping_tasks_queue
+
+logger = logging.getLogger(__name__)
+
+GOLDEN_RATIO_FRACTION = (math.sqrt(5) - 1) / 2
+ADAPTIVE_OBSERVATION_WINDOW = timedelta(days=7)
+ADAPTIVE_MAX_RUN_INTERVAL = timedelta(days=1)
+ADAPTIVE_RUNS_PER_ARRIVAL = 4
+QUIET_HOURS_TIMEZONE = ZoneInfo("Europe/Kyiv")
+QUIET_HOURS_END_SPREAD = timedelta(minutes=30)
+FAILURE_BACKOFF_THRESHOLD = 5
+FAILURE_BACKOFF_MAX_RUN_INTERVAL = timedelta(days=1)
+MONITORINGS_CHANNEL = "monitorings_changed"
+
+
+def get_canonical_url(url: str) -> str:
+    """Returns canonical form of the URL, equal for URLs of the same search.
+
+    Scheme and host are lowercased, query parameters are sorted, fragment and trailing slash are dropped.
+
+    Args:
+        url (str): URL.
+
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+
+def get_next_run_at(monitoring_url: str, run_interval: timedelta, last_run_at: datetime) -> datetime:
+    """Returns the next run time of a monitoring, placed on the own slot of its URL within the run interval.
+
+    Each URL gets a deterministic phase within the run interval (golden ratio hashing of the URL checksum),
+    so monitorings with the same interval are spread evenly over it instead of becoming due at the same time,
+    while monitorings of the same URL become due together and are crawled once.
+    The next run is placed on the slot nearest to `last_run_at + run_interval`.
+
+    Args:
+        monitoring_url (str): Monitoring URL.
+        run_interval (timedelta): Monitoring run interval.
+        last_run_at (datetime): Time of the last run.
+
+    """
+    interval = run_interval.total_seconds()
+    phase = (zlib.crc32(get_canonical_url(monitoring_url).encode()) * GOLDEN_RATIO_FRACTION) % 1 * interval
+    earliest = last_run_at.timestamp() + interval / 2
+    slot = math.ceil((earliest - phase) / interval) * interval + phase
+    return datetime.fromtimestamp(slot, tz=UTC)
+
+
+def get_adaptive_run_interval(run_interval: timedelta, arrivals: int, observed_period: timedelta) -> timedelta:
+    """Returns the effective run interval of a monitoring in adaptive mode.
+
+    The interval is set to make `ADAPTIVE_RUNS_PER_ARRIVAL` runs per expected time between runs with new adverts.
+    It is kept between the monitoring's own run interval and `ADAPTIVE_MAX_RUN_INTERVAL`.
+
+    Args:
+        run_interval (timedelta): Run interval chosen by the user.
+        arrivals (int): Number of runs with new adverts in the observed period.
+        observed_period (timedelta): Period in which arrivals were observed.
+
+    """
+    arrival_interval = observed_period / (arrivals + 1)
+    return min(
+        max(arrival_interval / ADAPTIVE_RUNS_PER_ARRIVAL, run_interval), max(ADAPTIVE_MAX_RUN_INTERVAL, run_interval)
+    )
+
+
+def get_failure_backoff_run_interval(run_interval: timedelta, consecutive_failures: int) -> timedelta:
+    """Returns the run interval of a monitoring that keeps failing.
+
+    After `FAILURE_BACKOFF_THRESHOLD` failed runs in a row the monitoring is paused: the run interval is doubled
+    with each further failure up to `FAILURE_BACKOFF_MAX_RUN_INTERVAL`, so a dead URL is only re-probed
+    from time to time. The first successful run brings the monitoring back to its run interval.
+
+    Args:
+        run_interval (timedelta): Run interval of the monitoring.
+        consecutive_failures (int): Number of failed runs in a row.
+
+    """
+    if consecutive_failures < FAILURE_BACKOFF_THRESHOLD:
+        return run_interval
+    backoff_exponent = min(consecutive_failures - FAILURE_BACKOFF_THRESHOLD + 1, 16)
+    return max(min(run_interval * 2**backoff_exponent, FAILURE_BACKOFF_MAX_RUN_INTERVAL), run_interval)
+
+
+def get_quiet_hours_end(moment: datetime, start: time, end: time) -> datetime | None:
+    """Returns the end of the quiet hours window the moment falls into, if any.
+
+    Quiet hours are set in `QUIET_HOURS_TIMEZONE` and may span midnight (e.g. from 23:00 to 07:00).
+
+    Args:
+        moment (datetime): Moment to check.
+        start (time): Start of quiet hours.
+        end (time): End of quiet hours.
+
+    """
+    local_moment = moment.astimezone(QUIET_HOURS_TIMEZONE)
+    start_at = datetime.combine(local_moment.date(), start, tzinfo=QUIET_HOURS_TIMEZONE)
+    end_at = datetime.combine(local_moment.date(), end, tzinfo=QUIET_HOURS_TIMEZONE)
+    if start < end:
+        return end_at if start_at <= local_moment < end_at else None
+    if start > end:
+        if local_moment >= start_at:
+            return end_at + timedelta(days=1)
+        if local_moment < end_at:
+            return end_at
+    return None
+
+
+def get_next_run_after_quiet_hours(monitoring_url: str, quiet_hours_end: datetime) -> datetime:
+    """Returns the first run time after quiet hours.
+
+    Runs are spread over `QUIET_HOURS_END_SPREAD` after the end of quiet hours by the slot of their URL,
+    so monitorings of users with the same quiet hours don't become due at once.
+
+    Args:
+        monitoring_url (str): Monitoring URL.
+        quiet_hours_end (datetime): End of quiet hours.
+
+    """
+    return get_next_run_at(monitoring_url, QUIET_HOURS_END_SPREAD, quiet_hours_end - QUIET_HOURS_END_SPREAD / 2)
+
+
+class ScheduledMonitoring(DatabaseReadSchema):
+    """Monitoring state required for scheduling."""
+
+    id: int
+    enabled: bool
+    next_run_at: datetime | None
+
+
+class AdvertArrivals(DatabaseReadSchema):
+    """Number of monitoring runs that found new adverts."""
+
+    arrivals: int
+
+
+async def schedule_next_run(database: DatabaseProvider, monitoring: MonitoringRead, succeeded: bool) -> None:
+    """Schedules the next run of the monitoring after its run is finished.
+
+    Runs that fall into quiet hours of the user are skipped, the first run after them brings all adverts
+    that appeared during quiet hours. Monitorings that keep failing are re-probed with exponential backoff.
+
+    Args:
+        database (DatabaseProvider): Provider for the database.
+        monitoring (MonitoringRead): Monitoring to schedule.
+        succeeded (bool): Whether the finished run succeeded.
+
+    """
+    last_run_at = monitoring.last_run_at or datetime.now(UTC)
+    run_interval = monitoring.run_interval
+    if monitoring.adaptive_interval:
+        observed_since = max(monitoring.created_at, last_run_at - ADAPTIVE_OBSERVATION_WINDOW)
+        advert_arrivals = await database.get_by_query(
+            query=select(
+                func.count(distinct(Advert.first_monitoring_run_id)).label("arrivals")  # pylint: disable=E1102
+            ).where(Advert.monitoring_id == monitoring.id, Advert.created_at >= observed_since),
+            by_mappings=True,
+            read_schema=AdvertArrivals,
+        )
+        run_interval = get_adaptive_run_interval(
+            run_interval,
+            advert_arrivals.arrivals if advert_arrivals else 0,
+            last_run_at - observed_since,
+        )
+    consecutive_failures = 0 if succeeded else monitoring.consecutive_failures + 1
+    run_interval = get_failure_backoff_run_interval(run_interval, consecutive_failures)
+    next_run_at = get_next_run_at(monitoring.url, run_interval, last_run_at)
+    user = await database.get(model=User, filters=[User.id == monitoring.user_id], read_schema=UserRead)
+    if user and user.quiet_hours_enabled:
+        quiet_hours_end = get_quiet_hours_end(next_run_at, user.quiet_hours_start, user.quiet_hours_end)
+        if quiet_hours_end:
+            next_run_at = get_next_run_after_quiet_hours(monitoring.url, quiet_hours_end)
+    await database.update(
+        model=Monitoring,
+        data=MonitoringScheduleUpdate(
+            next_run_at=next_run_at,
+            last_success_at=last_run_at if succeeded else None,
+            effective_run_interval=run_interval,
+            consecutive_failures=consecutive_failures,
+        ),
+        filters=[Monitoring.id == monitoring.id],
+    )
+
+
+class DueTimeQueue:
+    """Queue of monitorings ordered by their due times.
+
+    Keeps a min-heap of monitorings keyed by their due times, re-scheduled monitorings are removed from the heap
+    lazily. Monitorings overdue by more than `catch_up_threshold` (e.g. after scheduler downtime) are not released
+    at once, they are spread over time so that at most `catch_up_rate` of them are released per second.
+
+    Args:
+        catch_up_rate (int): Maximum number of overdue monitorings released per second.
+        catch_up_threshold (timedelta): Lateness after which monitorings are spread over time.
+
+    """
+
+    _catch_up_step: timedelta
+    _catch_up_threshold: timedelta
+    _catch_up_at: datetime
+    _heap: list[tuple[datetime, int]]
+    _due_times: dict[int, datetime]
+
+    def __init__(self, catch_up_rate: int, catch_up_threshold: timedelta) -> None:
+        self._catch_up_step = timedelta(seconds=1 / catch_up_rate)
+        self._catch_up_threshold = catch_up_threshold
+        self._catch_up_at = datetime.now(UTC)
+        self._heap = []
+        self._due_times = {}
+
+    def __len__(self) -> int:
+        return len(self._due_times)
+
+    def get_next_due_at(self) -> datetime | None:
+        """Returns the earliest due time in the queue, if any."""
+        return self._heap[0][0] if self._heap else None
+
+    def schedule(self, monitoring_id: int, due_at: datetime) -> None:
+        """Schedules monitoring, replacing its previous due time if any.
+
+        Args:
+            monitoring_id (int): Monitoring ID.
+            due_at (datetime): Time when the monitoring is due.
+
+        """
+        if self._due_times.get(monitoring_id) == due_at:
+            return
+        self._due_times[monitoring_id] = due_at
+        heapq.heappush(self._heap, (due_at, monitoring_id))
+
+    def unschedule(self, monitoring_id: int) -> None:
+        """Removes monitoring from the queue.
+
+        Args:
+            monitoring_id (int): Monitoring ID.
+
+        """
+        self._due_times.pop(monitoring_id, None)
+
+    def pop_due(self, now: datetime) -> list[int]:
+        """Removes due monitorings from the queue and returns their IDs.
+
+        Overdue monitorings are re-scheduled to the next free catch-up slots instead.
+
+        Args:
+            now (datetime): Current time.
+
+        """
+        monitoring_ids = []
+        self._catch_up_at = max(self._catch_up_at, now)
+        while self._heap and self._heap[0][0] <= now:
+            due_at, monitoring_id = heapq.heappop(self._heap)
+            if self._due_times.get(monitoring_id) != due_at:
+                continue
+            if due_at < now - self._catch_up_threshold:
+                self.schedule(monitoring_id, self._catch_up_at)
+                self._catch_up_at += self._catch_up_step
+                continue
+            del self._due_times[monitoring_id]
+            monitoring_ids.append(monitoring_id)
+        return monitoring_ids
+
+
+class MonitoringScheduler:
+    """Scheduler that triggers monitorings exactly when they are due.
+
+    Keeps a queue of enabled monitorings keyed by their `next_run_at`. The queue is loaded once at startup
+    and then updated with notifications sent by the `monitorings` table trigger to `MONITORINGS_CHANNEL`,
+    so created, re-enabled or re-scheduled monitorings are picked up immediately. Periodic incremental syncs
+    with monitorings changed since the previous sync are kept as a fallback for missed notifications.
+    Monitorings with a run in progress (empty `next_run_at`) are kept out of the queue until the run is finished.
+    Monitorings with manually scheduled runs are due immediately, the `monitoring_runs` table trigger notifies
+    about such runs to the same channel, and syncs pick up the ones still waiting in scheduled status.
+    Due monitorings are published as one trigger per shard (`monitoring_id % shard_count`) to the shard's queue,
+    which is declared at startup so triggers published before its leader is elected are kept.
+
+    Monitorings overdue by more than `catch_up_threshold` (e.g. after scheduler downtime) are not released
+    at once, they are spread over time so that at most `scheduler_catch_up_rate` of them are released per second.
+
+    Args:
+        broker (RabbitBroker): Broker to publish trigger messages to.
+        settings (TasksSettings): Tasks settings with sync interval, catch-up rate and number of trigger shards.
+        shards (list[int] | None): Shards scheduled by this scheduler. If not provided, all shards are scheduled.
+            Default is None.
+
+    """
+
+    sync_overlap = timedelta(minutes=1)
+    catch_up_threshold = timedelta(minutes=1)
+
+    _broker: RabbitBroker
+    _settings: TasksSettings
+    _shards: list[int]
+    _queue: DueTimeQueue
+    _last_sync_at: datetime | None
+    _wake_up: asyncio.Event
+    _listen_connection: AsyncConnection | None
+
+    def __init__(self, broker: RabbitBroker, settings: TasksSettings, shards: list[int] | None = None) -> None:
+        self._broker = broker
+        self._settings = settings
+        self._shards = shards if shards is not None else list(range(settings.trigger_shards))
+        self._queue = DueTimeQueue(settings.scheduler_catch_up_rate, self.catch_up_threshold)
+        self._last_sync_at = None
+        self._wake_up = asyncio.Event()
+        self._listen_connection = None
+
+    async def run(self) -> None:
+        """Runs the scheduler loop."""
+        await self._broker.connect()
+        for shard in self._shards:
+            await self._broker.declare_queue(get_trigger_scraping_tasks_queue(shard))
+        try:
+            next_sync_at = datetime.now(UTC)
+            while True:
+                self._wake_up.clear()
+                now = datetime.now(UTC)
+                if now >= next_sync_at:
+                    await self._listen()
+                    await self._sync(now)
+                    next_sync_at = now + timedelta(seconds=self._settings.scheduler_sync_interval)
+
+                if monitoring_ids := self._pop_due(now):
+                    await self._publish(monitoring_ids)
+
+                next_due_at = self._queue.get_next_due_at()
+                wake_up_at = min(next_sync_at, next_due_at) if next_due_at else next_sync_at
+                try:
+                    await asyncio.wait_for(
+                        self._wake_up.wait(), timeout=max((wake_up_at - datetime.now(UTC)).total_seconds(), 0)
+                    )
+                except TimeoutError:
+                    pass
+        finally:
+            await self._close_listen_connection()
+            await self._broker.close()
+
+    async def _publish(self, monitoring_ids: list[int]) -> None:
+        """Publishes one trigger per shard for due monitorings.
+
+        Args:
+            monitoring_ids (list[int]): IDs of due monitorings.
+
+        """
+        shard_monitoring_ids: dict[int, list[int]] = {}
+        for monitoring_id in monitoring_ids:
+            shard_monitoring_ids.setdefault(monitoring_id % self._settings.trigger_shards, []).append(monitoring_id)
+
+        for shard, ids in shard_monitoring_ids.items():
+            await self._broker.publish(
+                TriggerTask(monitoring_ids=ids, shard=shard),
+                queue=get_trigger_scraping_tasks_queue(shard),
+                persist=True,
+            )
+        logger.info("Triggered %s due monitorings in %s shards", len(monitoring_ids), len(shard_monitoring_ids))
+
+    def schedule(self, monitoring_id: int, due_at: datetime) -> None:
+        """Schedules monitoring, replacing its previous due time if any.
+
+        Args:
+            monitoring_id (int): Monitoring ID.
+            due_at (datetime): Time when the monitoring is due.
+
+        """
+        self._queue.schedule(monitoring_id, due_at)
+
+    def unschedule(self, monitoring_id: int) -> None:
+        """Removes monitoring from the schedule.
+
+        Args:
+            monitoring_id (int): Monitoring ID.
+
+        """
+        self._queue.unschedule(monitoring_id)
+
+    def _apply(self, monitoring: ScheduledMonitoring) -> None:
+        """Schedules or unschedules monitoring according to its state.
+
+        Args:
+            monitoring (ScheduledMonitoring): Monitoring state.
+
+        """
+        if monitoring.enabled and monitoring.next_run_at is not None:
+            self.schedule(monitoring.id, monitoring.next_run_at)
+        else:
+            self.unschedule(monitoring.id)
+
+    async def _listen(self) -> None:
+        """Checks the listening connection and re-opens it if it is lost.
+
+        Notifications sent while the connection was down are covered by the sync that follows.
+
+        """
+        if self._listen_connection is not None:
+            try:
+                await self._listen_connection.execute(select(1))
+                return
+            except Exception:  # pylint: disable=W0718
+                logger.exception("Lost connection listening to monitoring notifications")
+                await self._close_listen_connection()
+        try:
+            connection = await engine.connect()
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            raw_connection = await connection.get_raw_connection()
+            if raw_connection.driver_connection is None:
+                raise ValueError("Connection has no asyncpg driver connection")
+            await raw_connection.driver_connection.add_listener(MONITORINGS_CHANNEL, self._on_notification)
+        except Exception:  # pylint: disable=W0718
+            logger.exception("Failed to listen to monitoring notifications, relying on syncs")
+            return
+        self._listen_connection = connection
+
+    def _on_notification(self, _connection: object, _pid: int, _channel: str, payload: str) -> None:
+        """Applies notified monitoring state to the schedule and wakes up the scheduler loop.
+
+        Args:
+            _connection (object): Connection that received the notification.
+            _pid (int): PID of the notifying backend.
+            _channel (str): Notification channel.
+            payload (str): JSON with the monitoring state.
+
+        """
+        try:
+            monitoring = ScheduledMonitoring.model_validate_json(payload)
+        except ValueError:
+            logger.exception("Invalid monitoring notification: %s", payload)
+            return
+        if monitoring.id % self._settings.trigger_shards not in self._shards:
+            return
+        self._apply(monitoring)
+        self._wake_up.set()
+
+    async def _close_listen_connection(self) -> None:
+        """Closes the listening connection without returning it to the pool."""
+        if self._listen_connection is None:
+            return
+        connection, self._listen_connection = self._listen_connection, None
+        try:
+            await connection.invalidate()
+            await connection.close()
+        except Exception:  # pylint: disable=W0718
+            logger.exception("Failed to close connection listening to monitoring notifications")
+
+    def _pop_due(self, now: datetime) -> list[int]:
+        """Returns IDs of due monitorings and re-schedules them for a re-check.
+
+        The re-check is a fallback for lost triggers, normally the monitoring is re-scheduled by the next sync,
+        once its run is created.
+
+        Args:
+            now (datetime): Current time.
+
+        """
+        monitoring_ids = self._queue.pop_due(now)
+        for monitoring_id in monitoring_ids:
+            self.schedule(monitoring_id, now + timedelta(seconds=self._settings.scheduler_sync_interval))
+        return monitoring_ids
+
+    async def _sync(self, now: datetime) -> None:
+        """Syncs the schedule with the database.
+
+        The first sync loads all enabled monitorings, the next ones load only changed monitorings.
+        Monitorings with scheduled runs are loaded by each sync as due now.
+
+        Args:
+            now (datetime): Current time.
+
+        """
+        query = select(Monitoring.id, Monitoring.enabled, Monitoring.next_run_at)
+        if len(self._shards) < self._settings.trigger_shards:
+            query = query.where((Monitoring.id % self._settings.trigger_shards).in_(self._shards))
+        if self._last_sync_at is None:
+            query = query.where(Monitoring.enabled.is_(True), Monitoring.next_run_at.is_not(None))
+        else:
+            query = query.where(Monitoring.updated_at >= self._last_sync_at - self.sync_overlap)
+
+        scheduled_runs_query = (
+            select(
+                MonitoringRun.monitoring_id.label("id"),
+                true().label("enabled"),
+                func.now().label("next_run_at"),  # pylint: disable=E1102
+            )
+            .where(MonitoringRun.status == MonitoringRunStatus.SCHEDULED)
+            .distinct()
+        )
+        if len(self._shards) < self._settings.trigger_shards:
+            scheduled_runs_query = scheduled_runs_query.where(
+                (MonitoringRun.monitoring_id % self._settings.trigger_shards).in_(self._shards)
+            )
+
+        async with get_database() as database:
+            monitorings = await database.get_all_by_query(query=query, read_schema=ScheduledMonitoring)
+            monitorings.extend(
+                await database.get_all_by_query(query=scheduled_runs_query, read_schema=ScheduledMonitoring)
+            )
+
+        for monitoring in monitorings:
+            self._apply(monitoring)
+
+        logger.debug("Synced %s monitorings, %s scheduled in total", len(monitorings), len(self._queue))
+        self._last_sync_at = now
@@ -0,0 +1,224 @@
+import logging
+import multiprocessing
+import signal
+import time
+from datetime import UTC, datetime, timedelta
+from multiprocessing.context import SpawnContext, SpawnProcess
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerProcessStatus(BaseModel):
+    """Status of a worker process."""
+
+    index: int
+    pid: int | None
+    alive: bool
+    started_at: datetime
+    restarts: int
+
+
+class SupervisorStatus(BaseModel):
+    """Aggregate status of worker processes."""
+
+    processes: int
+    alive_processes: int
+    restarts: int
+    updated_at: datetime
+    workers: list[WorkerProcessStatus]
+
+
+class SupervisedProcess:
+    """Child process of the supervisor with its restart state.
+
+    Args:
+        index (int): Index of the child.
+
+    """
+
+    index: int
+    process: SpawnProcess | None
+    started_at: datetime
+    restarts: int
+    crashes: int
+    restart_at: datetime | None
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.process = None
+        self.started_at = datetime.now(UTC)
+        self.restarts = 0
+        self.crashes = 0
+        self.restart_at = None
+
+    def get_status(self) -> WorkerProcessStatus:
+        """Returns status of the child."""
+        return WorkerProcessStatus(
+            index=self.index,
+            pid=self.process.pid if self.process else None,
+            alive=self.process is not None and self.process.is_alive(),
+            started_at=self.started_at,
+            restarts=self.restarts,
+        )
+
+
+class WorkerSupervisor:
+    """Supervisor of shared-nothing worker processes.
+
+    Starts `processes` children (spawned, so they don't share anything with the supervisor, including connections)
+    and restarts the ones that exit. A child that keeps crashing is restarted with exponential backoff,
+    up to `max_restart_delay`. On SIGTERM or SIGINT the children are terminated gracefully: they are given
+    their own graceful timeout to drain in-flight handlers, plus `stop_margin` to shut down, before being killed.
+    Aggregate status of the children is logged on changes and written to `status_file` every `check_interval`.
+
+    Args:
+        target (Callable[..., None]): Function run by each child. Must be importable by its module path,
+            so it can't be defined in `__main__`.
+        args (tuple[Any, ...]): Arguments of the target.
+        processes (int): Number of children.
+        graceful_timeout (timedelta): Time the children wait for in-flight handlers on shutdown.
+
+    """
+
+    max_restart_delay = timedelta(minutes=1)
+    stable_run_time = timedelta(minutes=1)
+    stop_margin = timedelta(seconds=30)
+    check_interval = timedelta(seconds=1)
+    status_file = Path("./storage/worker_status.json")
+
+    _target: Callable[..., None]
+    _args: tuple[Any, ...]
+    _context: SpawnContext
+    _children: list[SupervisedProcess]
+    _stop_timeout: timedelta
+    _stopping: bool
+
+    def __init__(
+        self, target: Callable[..., None], args: tuple[Any, ...], processes: int, graceful_timeout: timedelta
+    ) -> None:
+        self._target = target
+        self._args = args
+        self._context = multiprocessing.get_context("spawn")
+        self._children = [SupervisedProcess(index) for index in range(processes)]
+        self._stop_timeout = graceful_timeout + self.stop_margin
+        self._stopping = False
+
+    def run(self) -> None:
+        """Runs the children and supervises them until the supervisor is stopped."""
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for child in self._children:
+            self._start(child)
+        logger.info("Started %s worker processes", len(self._children))
+
+        alive_processes = len(self._children)
+        try:
+            while not self._stopping:
+                for child in self._children:
+                    self._check(child)
+                status = self.get_status()
+                if status.alive_processes != alive_processes:
+                    logger.info("%s of %s worker processes are alive", status.alive_processes, status.processes)
+                    alive_processes = status.alive_processes
+                self._write_status(status)
+                time.sleep(self.check_interval.total_seconds())
+        finally:
+            self._terminate()
+
+    def get_status(self) -> SupervisorStatus:
+        """Returns aggregate status of the children."""
+        workers = [child.get_status() for child in self._children]
+        return SupervisorStatus(
+            processes=len(workers),
+            alive_processes=sum(worker.alive for worker in workers),
+            restarts=sum(worker.restarts for worker in workers),
+            updated_at=datetime.now(UTC),
+            workers=workers,
+        )
+
+    def _start(self, child: SupervisedProcess) -> None:
+        """Starts the child.
+
+        Args:
+            child (SupervisedProcess): Child to start.
+
+        """
+        process = self._context.Process(target=self._target, args=self._args, name=f"worker-{child.index}")
+        process.start()
+        child.process = process
+        child.started_at = datetime.now(UTC)
+        child.restart_at = None
+
+    def _check(self, child: SupervisedProcess) -> None:
+        """Restarts the child if it has exited and its restart delay has passed.
+
+        Args:
+            child (SupervisedProcess): Child to check.
+
+        """
+        process = child.process
+        if process is None or process.is_alive() or self._stopping:
+            return
+
+        now = datetime.now(UTC)
+        restart_at = child.restart_at
+        if restart_at is None:
+            if now - child.started_at >= self.stable_run_time:
+                child.crashes = 0
+            delay = min(timedelta(seconds=2**child.crashes), self.max_restart_delay)
+            child.crashes += 1
+            restart_at = child.restart_at = now + delay
+            logger.warning(
+                "Worker process %s exited with code %s, restarting in %s", child.index, process.exitcode, delay
+            )
+        if now < restart_at:
+            return
+
+        process.close()
+        child.restarts += 1
+        self._start(child)
+
+    def _write_status(self, status: SupervisorStatus) -> None:
+        """Writes aggregate status to the status file.
+
+        Args:
+            status (SupervisorStatus): Status to write.
+
+        """
+        try:
+            self.status_file.parent.mkdir(parents=True, exist_ok=True)
+            self.status_file.write_text(status.model_dump_json(indent=2), encoding="utf-8")
+        except OSError:
+            logger.exception("Failed to write supervisor status")
+
+    def _stop(self, signum: int, _frame: FrameType | None) -> None:
+        """Stops supervising on signal.
+
+        Args:
+            signum (int): Received signal.
+            _frame (FrameType | None): Current stack frame.
+
+        """
+        logger.info("Received signal %s, stopping worker processes", signum)
+        self._stopping = True
+
+    def _terminate(self) -> None:
+        """Terminates the children gracefully, killing the ones that don't stop in time."""
+        self._stopping = True
+        processes = [child.process for child in self._children if child.process is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self._stop_timeout.total_seconds()
+        for process in processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning("Worker process %s didn't stop in time, killing it", process.pid)
+                process.kill()
+                process.join()
+        logger.info("Stopped %s worker processes", len(processes))
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+import resource
+import sys
+from datetime import timedelta
+from types import TracebackType
+from typing import ClassVar
+
+from faststream import BaseMiddleware, FastStream
+
+logger = logging.getLogger(__name__)
+
+
+def get_rss_mb() -> float:
+    """Returns resident set size of the current process in megabytes.
+
+    Current RSS is read from `/proc` on Linux, other platforms fall back to the peak RSS.
+
+    """
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as statm_file:
+            resident_pages = int(statm_file.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except (OSError, ValueError, IndexError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+
+
+class ProcessedTasksMiddleware(BaseMiddleware):
+    """Middleware that counts messages processed by the worker process."""
+
+    processed_tasks: ClassVar[int] = 0
+
+    async def after_processed(
+        self,
+        exc_type: type[BaseException] | None = None,
+        exc_val: BaseException | None = None,
+        exc_tb: TracebackType | None = None,
+    ) -> bool | None:
+        """Counts the processed message.
+
+        Args:
+            exc_type (type[BaseException] | None): Type of the exception raised by the handler, if any.
+            exc_val (BaseException | None): Exception raised by the handler, if any.
+            exc_tb (TracebackType | None): Traceback of the exception, if any.
+
+        """
+        ProcessedTasksMiddleware.processed_tasks += 1
+        return await super().after_processed(exc_type, exc_val, exc_tb)
+
+
+class WorkerWatchdog:
+    """Watchdog that recycles the worker process once it grows too big or has processed too many tasks.
+
+    RSS and the number of processed tasks are sampled every `check_interval`. Past a threshold the app is asked
+    to exit: the broker stops consuming and waits for in-flight handlers (up to its graceful timeout), and the process
+    exits cleanly, so the supervisor or the container runtime restarts it.
+
+    Args:
+        app (FastStream): Worker app to stop.
+        max_rss_mb (int): Maximum RSS in megabytes. Zero disables the check.
+        max_tasks (int): Maximum number of processed tasks. Zero disables the check.
+        check_interval (timedelta): Interval between samples.
+
+    """
+
+    _app: FastStream
+    _max_rss_mb: int
+    _max_tasks: int
+    _check_interval: timedelta
+    _recycle_reason: str | None
+    _task: asyncio.Task | None
+
+    def __init__(self, app: FastStream, max_rss_mb: int, max_tasks: int, check_interval: timedelta) -> None:
+        self._app = app
+        self._max_rss_mb = max_rss_mb
+        self._max_tasks = max_tasks
+        self._check_interval = check_interval
+        self._recycle_reason = None
+        self._task = None
+
+    async def start(self) -> None:
+        """Starts the watchdog loop in background."""
+        if self._max_rss_mb > 0 or self._max_tasks > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the watchdog loop and logs the recycle, if it was requested by the watchdog."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._recycle_reason is not None:
+            logger.warning(
+                "Worker recycled (%s), processed %s tasks, RSS at exit: %.1f MB",
+                self._recycle_reason,
+                ProcessedTasksMiddleware.processed_tasks,
+                get_rss_mb(),
+            )
+
+    def get_recycle_reason(self) -> str | None:
+        """Returns the reason to recycle the worker, if any threshold is exceeded."""
+        rss_mb = get_rss_mb()
+        if 0 < self._max_rss_mb <= rss_mb:
+            return f"RSS {rss_mb:.1f} MB exceeds {self._max_rss_mb} MB"
+        processed_tasks = ProcessedTasksMiddleware.processed_tasks
+        if 0 < self._max_tasks <= processed_tasks:
+            return f"{processed_tasks} processed tasks exceed {self._max_tasks}"
+        return None
+
+    async def _run(self) -> None:
+        """Samples the worker and asks the app to exit once a threshold is exceeded."""
+        while True:
+            await asyncio.sleep(self._check_interval.total_seconds())
+            if recycle_reason := self.get_recycle_reason():
+                logger.warning("Recycling worker: %s, draining in-flight tasks", recycle_reason)
+                self._recycle_reason = recycle_reason
+                self._app.exit()
+                return
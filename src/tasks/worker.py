@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from faststream import FastStream
+from faststream.rabbit import RabbitBroker
+
+from scrapers.parsers import shutdown_parser_pool
+from settings import TasksSettings
+from tasks.queues import (
+    SCRAPING_RESULTS_QUEUE,
+    SCRAPING_TASKS_QUEUE,
+    TRIGGER_SCRAPING_TASKS_QUEUE_NAME,
+)
+from tasks.routers import (
+    results_router,
+    scraping_router,
+    trigger_leader,
+    trigger_router,
+)
+from tasks.watchdog import ProcessedTasksMiddleware, WorkerWatchdog
+
+QUEUE_ROUTERS = {
+    TRIGGER_SCRAPING_TASKS_QUEUE_NAME: trigger_router,
+    SCRAPING_TASKS_QUEUE.name: scraping_router,
+    SCRAPING_RESULTS_QUEUE.name: results_router,
+}
+WATCHDOG_CHECK_INTERVAL = timedelta(seconds=10)
+
+
+async def get_broker(settings: TasksSettings) -> RabbitBroker:
+    """Returns a RabbitMQ broker instance.
+
+    On shutdown the broker waits for in-flight handlers up to `worker_graceful_timeout` seconds.
+
+    """
+    return RabbitBroker(
+        settings.get_broker_url(),
+        graceful_timeout=settings.worker_graceful_timeout,
+        middlewares=[ProcessedTasksMiddleware],
+    )
+
+
+async def run_worker(settings: TasksSettings, queues: list[str]) -> None:
+    """Runs the FastStream worker.
+
+    Args:
+        settings (TasksSettings): Tasks settings.
+        queues (list[str]): Names of the queues to consume.
+
+    """
+    broker = await get_broker(settings)
+    for queue in queues:
+        broker.include_router(QUEUE_ROUTERS[queue])
+
+    app = FastStream(broker)
+    watchdog = WorkerWatchdog(
+        app=app,
+        max_rss_mb=settings.worker_max_rss,
+        max_tasks=settings.worker_max_tasks,
+        check_interval=WATCHDOG_CHECK_INTERVAL,
+    )
+    app.after_startup(watchdog.start)
+    app.after_shutdown(watchdog.stop)
+    if TRIGGER_SCRAPING_TASKS_QUEUE_NAME in queues:
+        # Locks are released only after the broker has finished in-flight triggers, so standbys don't take over
+        # shards that are still being processed.
+        trigger_leader.broker = broker
+        app.after_startup(trigger_leader.start)
+        app.after_shutdown(trigger_leader.stop)
+    app.after_shutdown(shutdown_parser_pool)
+    await app.run(log_level=logging.getLevelName(settings.log_level))
+
+
+def run_worker_process(queues: list[str]) -> None:
+    """Runs the FastStream worker in a process started by the supervisor.
+
+    Lives outside `tasks.__main__`, so spawned children can import it by its module path.
+
+    Args:
+        queues (list[str]): Names of the queues to consume.
+
+    """
+    settings = TasksSettings()
+    logging.basicConfig(level=settings.log_level)
+    asyncio.run(run_worker(settings, queues))
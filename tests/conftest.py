@@ -0,0 +1,140 @@
+import os
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import Executable
+from sqlalchemy.dialects import postgresql
+
+# Settings are read at import time of the modules under test, nothing is connected to in tests.
+TEST_ENVIRONMENT = {
+    "DATABASE_HOST": "localhost",
+    "DATABASE_PORT": "5432",
+    "DATABASE_USER": "test",
+    "DATABASE_PASSWORD": "test",
+    "DATABASE_NAME": "test",
+    "SCRAPERS_LOG_LEVEL": "INFO",
+    "SCRAPERS_USER_AGENT": "test",
+    "SCRAPERS_CONCURRENCY": "4",
+    "SCRAPERS_PARSE_PROCESSES": "0",
+    "SCRAPERS_PUBLISH_BATCH_SIZE": "100",
+    "SCRAPERS_PUBLISH_LINGER": "0.5",
+    "SCRAPERS_DEBUG_MODE": "False",
+    "TASKS_LOG_LEVEL": "INFO",
+    "TASKS_BROKER_HOST": "localhost",
+    "TASKS_BROKER_PORT": "5672",
+    "TASKS_BROKER_MANAGEMENT_PORT": "15672",
+    "TASKS_BROKER_USER": "test",
+    "TASKS_BROKER_PASSWORD": "test",
+    "TASKS_BROKER_VHOST": "test",
+    "TASKS_SCHEDULER_SYNC_INTERVAL": "10",
+    "TASKS_SCHEDULER_CATCH_UP_RATE": "20",
+    "TASKS_TRIGGER_LEADER_CHECK_INTERVAL": "2",
+    "TASKS_TRIGGER_SHARDS": "1",
+    "TASKS_TRIGGER_MAX_SHARDS_PER_WORKER": "1",
+    "TASKS_RUN_HEARTBEAT_INTERVAL": "30",
+    "TASKS_RUN_HEARTBEAT_TIMEOUT": "300",
+    "TASKS_RUN_QUEUED_TIMEOUT": "3600",
+    "TASKS_REAPER_INTERVAL": "60",
+    "TASKS_USER_CRAWL_SECONDS_PER_HOUR": "600",
+    "TASKS_WORKER_MAX_RSS": "1024",
+    "TASKS_WORKER_MAX_TASKS": "10000",
+    "TASKS_WORKER_GRACEFUL_TIMEOUT": "600",
+    "BOT_LOG_LEVEL": "INFO",
+    "BOT_TOKEN": "123456:test-token",
+}
+os.environ.update(TEST_ENVIRONMENT)
+
+
+class FakeDatabase:
+    """Database provider stand-in that records queries and answers them with rows returned by `respond`.
+
+    Args:
+        respond (Callable[[Executable, type], list[Any]]): Returns rows of the query by the query and its read schema.
+
+    Attributes:
+        queries (list[Executable]): Executed queries, one per round trip.
+
+    """
+
+    def __init__(self, respond: Any) -> None:
+        self.respond = respond
+        self.queries: list[Executable] = []
+
+    async def __aenter__(self) -> "FakeDatabase":
+        return self
+
+    async def __aexit__(self, *_args: Any) -> None:
+        return None
+
+    async def get_all_by_query(self, query: Executable, read_schema: type, **_kwargs: Any) -> list[Any]:
+        self.queries.append(query)
+        return self.respond(query, read_schema)
+
+    async def get_by_query(self, query: Executable, read_schema: type, **_kwargs: Any) -> Any:
+        self.queries.append(query)
+        rows = self.respond(query, read_schema)
+        return rows[0] if rows else None
+
+
+MARKETPLACE_NAMES = ["Olx UA", "Shafa UA", "Unlimited"]
+
+
+def get_marketplace_name(monitoring_id: int) -> str:
+    """Returns marketplace name of the fake monitoring."""
+    return MARKETPLACE_NAMES[monitoring_id % len(MARKETPLACE_NAMES)]
+
+
+def get_bound_params(query: Executable) -> dict[str, Any]:
+    """Returns bound parameters of the query by their names."""
+    return query.compile(dialect=postgresql.asyncpg.dialect()).construct_params()
+
+
+@pytest.fixture(name="trigger_database")
+def trigger_database_fixture(monkeypatch: pytest.MonkeyPatch) -> FakeDatabase:
+    """Returns database stand-in used by the trigger, answering its queries like the database would.
+
+    Every monitoring the trigger asks for is due, and every admitted monitoring gets a queued run.
+    Published scraping tasks are confirmed right away and circuit breakers are disabled.
+
+    """
+    pytest.importorskip("fastcrawl")
+    from tasks.routers import trigger  # pylint: disable=C0415
+    from tasks.routers.trigger import DueMonitoring, QueuedRun  # pylint: disable=C0415
+
+    def respond(query: Executable, read_schema: type) -> list[Any]:
+        params = get_bound_params(query)
+        now = datetime.now(UTC)
+        if read_schema is DueMonitoring:
+            return [
+                DueMonitoring(
+                    id=monitoring_id,
+                    user_id=monitoring_id % 1000,
+                    url=f"https://example.com/catalog/{monitoring_id}",
+                    marketplace_name=get_marketplace_name(monitoring_id),
+                    run_interval=timedelta(minutes=5),
+                    next_run_at=now - timedelta(seconds=monitoring_id % 300),
+                    user_crawl_seconds=(monitoring_id % 1000) * 2,
+                    user_runs=monitoring_id % 100,
+                )
+                for monitoring_id in params["monitoring_ids"]
+            ]
+        assert read_schema is QueuedRun
+        return [
+            QueuedRun(
+                monitoring_id=monitoring_id,
+                monitoring_url=f"https://example.com/catalog/{monitoring_id}",
+                monitoring_run_id=monitoring_id,
+                marketplace_name=get_marketplace_name(monitoring_id),
+            )
+            for monitoring_id in params["admitted_monitoring_ids"]
+        ]
+
+    async def publish(*_args: Any, **_kwargs: Any) -> None:
+        pass
+
+    database = FakeDatabase(respond)
+    monkeypatch.setattr(trigger, "get_database", lambda: database)
+    monkeypatch.setattr(trigger, "circuit_breakers", {})
+    monkeypatch.setattr(trigger.scraping_task_publisher, "publish", publish)
+    return database
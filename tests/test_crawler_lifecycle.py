@@ -0,0 +1,266 @@
+import asyncio
+import gc
+import json
+import logging
+import os
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+pytest.importorskip("fastcrawl")
+
+from fastcrawl import Request, Response
+
+from database.schemas import AdvertCreate
+from scrapers.concurrency import AimdConcurrencyController, MarketplaceProfile
+from scrapers.crawlers import BaseAdvertCrawler, CrawlLimits
+from scrapers.pipelines import publish_advert_pipeline
+from tasks.watchdog import get_rss_mb
+
+RUNS = 300
+WARMUP_RUNS = 50
+SAMPLE_INTERVAL = 10
+PAGES = 3
+ADVERTS_PER_PAGE = 50
+SUBSCRIPTIONS = 2
+FD_TOLERANCE = 5
+RSS_TOLERANCE_MB = 5.0
+
+
+class StubMarketplace:
+    """Marketplace stub serving pages of JSON adverts over HTTP/1.1.
+
+    Args:
+        slow_pages (set[int]): Pages that are never answered.
+
+    """
+
+    def __init__(self, slow_pages: set[int] | None = None) -> None:
+        self.slow_pages = slow_pages or set()
+        self.open_connections = 0
+        self.server: asyncio.Server | None = None
+        self.handlers: set[asyncio.Task] = set()
+
+    @property
+    def url(self) -> str:
+        """URL of the catalog."""
+        assert self.server is not None
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/catalog"
+
+    async def start(self) -> None:
+        """Starts listening on a free local port."""
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        """Stops the server and drops open connections."""
+        assert self.server is not None
+        self.server.close()
+        for handler in self.handlers:
+            handler.cancel()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        handler = asyncio.current_task()
+        assert handler is not None
+        self.handlers.add(handler)
+        self.open_connections += 1
+        try:
+            while request_line := await reader.readline():
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if content_length := int(headers.get("content-length", 0)):
+                    await reader.readexactly(content_length)
+
+                page = int(parse_qs(urlsplit(request_line.split()[1].decode()).query)["page"][0])
+                if page in self.slow_pages:
+                    await asyncio.Event().wait()
+                body = json.dumps(
+                    {
+                        "adverts": [
+                            {"url": f"https://example.com/adverts/{page}-{index}", "title": f"Advert {page}-{index}"}
+                            for index in range(ADVERTS_PER_PAGE)
+                        ],
+                        "has_next_page": page < PAGES,
+                    }
+                ).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.open_connections -= 1
+            self.handlers.discard(handler)
+            writer.close()
+
+
+class StubCrawler(BaseAdvertCrawler):
+    """Crawler of the stub marketplace."""
+
+    async def generate_requests(self) -> AsyncIterator[Request]:
+        """Yields request of the first page."""
+        yield await self.start_request(self._build_request(1))
+
+    async def parse_page(self, response: Response, metadata: dict[str, Any]) -> AsyncIterator[AdvertCreate | Request]:
+        """Parses page of adverts.
+
+        Args:
+            response (Response): Page response.
+            metadata (dict[str, Any]): Request metadata with the page number.
+
+        """
+        self.finish_request(response)
+        data = response.get_json_data()
+        for item in data["adverts"]:
+            advert = AdvertCreate(
+                monitoring_id=self.monitoring_id,
+                monitoring_run_id=self.monitoring_run_id,
+                url=item["url"],
+                title=item["title"],
+            )
+            for monitoring_advert in self.fan_out_advert(advert):
+                yield monitoring_advert
+        if data["has_next_page"] and self.follow_next_page():
+            yield await self.start_request(self._build_request(metadata["page"] + 1))
+
+    def _build_request(self, page: int) -> Request:
+        return Request(url=f"{self.monitoring_url}?page={page}", callback=self.parse_page, callback_data={"page": page})
+
+
+class FakeBroker:
+    """Message broker stand-in recording connections and counting published messages.
+
+    Messages are only counted, so the brokers kept by the test don't grow the RSS it measures.
+
+    """
+
+    instances: list["FakeBroker"] = []
+
+    def __init__(self, *_args: Any, **_kwargs: Any) -> None:
+        self.connected = False
+        self.closed = False
+        self.published = 0
+        FakeBroker.instances.append(self)
+
+    async def connect(self) -> None:
+        self.connected = True
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def publish(self, message: AdvertCreate, **_kwargs: Any) -> None:
+        assert self.connected and not self.closed
+        self.published += 1
+
+
+@pytest.fixture(name="brokers")
+def brokers_fixture(monkeypatch: pytest.MonkeyPatch) -> list[FakeBroker]:
+    """Replaces the broker of the publish pipeline, returns brokers created by the pipelines."""
+    FakeBroker.instances = []
+    monkeypatch.setattr(publish_advert_pipeline, "RabbitBroker", FakeBroker)
+    return FakeBroker.instances
+
+
+@pytest.fixture(name="concurrency_controller")
+def concurrency_controller_fixture() -> AimdConcurrencyController:
+    """Returns concurrency controller of the stub marketplace."""
+    return AimdConcurrencyController(
+        MarketplaceProfile(
+            runs_per_minute=60,
+            run_deadline=60,
+            max_pages=PAGES,
+            initial_concurrency=4,
+            max_concurrency=8,
+            request_delay=0,
+            target_latency=1,
+        )
+    )
+
+
+def create_crawler(
+    marketplace: StubMarketplace, run_id: int, log_dir: Path, concurrency_controller: AimdConcurrencyController
+) -> StubCrawler:
+    """Returns crawler of the stub marketplace for the run."""
+    return StubCrawler(
+        monitoring_ids={run_id * SUBSCRIPTIONS + index: index for index in range(SUBSCRIPTIONS)},
+        monitoring_url=marketplace.url,
+        log_file=log_dir / f"{run_id}.log",
+        limits=CrawlLimits(
+            deadline=timedelta(minutes=1), max_pages=PAGES, concurrency_controller=concurrency_controller
+        ),
+    )
+
+
+def get_open_fds() -> int:
+    """Returns number of open file descriptors of the process."""
+    return len(os.listdir("/proc/self/fd"))
+
+
+@pytest.mark.skipif(not Path("/proc/self/fd").exists(), reason="file descriptors and RSS are read from /proc")
+async def test_repeated_crawls_release_resources(
+    tmp_path: Path, brokers: list[FakeBroker], concurrency_controller: AimdConcurrencyController
+) -> None:
+    marketplace = StubMarketplace()
+    await marketplace.start()
+    tasks_before = asyncio.all_tasks()
+    logger_names = []
+    open_fds = []
+    rss_mb = []
+    try:
+        for run_id in range(RUNS):
+            crawler = create_crawler(marketplace, run_id, tmp_path, concurrency_controller)
+            await crawler.run()
+            await crawler.close()
+            logger_names.append(crawler.logger.name)
+            assert not crawler.logger.handlers
+            del crawler
+            await asyncio.sleep(0)
+            if run_id % SAMPLE_INTERVAL == 0:
+                gc.collect()
+                open_fds.append(get_open_fds())
+                rss_mb.append(get_rss_mb())
+
+        await asyncio.sleep(0.1)
+        assert marketplace.open_connections == 0
+        assert asyncio.all_tasks() <= tasks_before
+    finally:
+        await marketplace.stop()
+
+    # After warm-up (connection pools, caches, lazy imports) both stay flat instead of growing with each run.
+    warmup_samples = WARMUP_RUNS // SAMPLE_INTERVAL
+    assert max(open_fds[warmup_samples:]) <= open_fds[warmup_samples] + FD_TOLERANCE
+    assert max(rss_mb[warmup_samples:]) <= rss_mb[warmup_samples] + RSS_TOLERANCE_MB
+    assert not set(logger_names) & set(logging.Logger.manager.loggerDict)
+    assert len(brokers) == RUNS
+    assert all(broker.connected and broker.closed for broker in brokers)
+    assert all(broker.published == PAGES * ADVERTS_PER_PAGE * SUBSCRIPTIONS for broker in brokers)
+    assert concurrency_controller._in_flight == 0
+
+
+async def test_cancelled_crawl_publishes_buffered_adverts(
+    tmp_path: Path, brokers: list[FakeBroker], concurrency_controller: AimdConcurrencyController
+) -> None:
+    marketplace = StubMarketplace(slow_pages={2})
+    await marketplace.start()
+    try:
+        crawler = create_crawler(marketplace, 0, tmp_path, concurrency_controller)
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(crawler.run(), timeout=0.2)
+        await crawler.close()
+    finally:
+        await marketplace.stop()
+
+    assert len(brokers) == 1
+    assert brokers[0].closed
+    assert brokers[0].published == ADVERTS_PER_PAGE * SUBSCRIPTIONS
+    assert not [task for task in asyncio.all_tasks() if task.get_coro().__qualname__.endswith("_flush_after_linger")]
+    assert concurrency_controller._in_flight == 0
@@ -0,0 +1,71 @@
+import heapq
+import random
+import statistics
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("fastcrawl")
+
+from tasks.routers.trigger import get_scraping_task_priority
+
+RUN_INTERVAL_SHARES = {
+    timedelta(minutes=5): 0.1,
+    timedelta(hours=1): 0.3,
+    timedelta(days=1): 0.6,
+}
+TASKS = 3000
+ARRIVAL_PERIOD = timedelta(minutes=30)
+TASK_DURATION = timedelta(seconds=1)
+MAX_PRIORITIZED_LATENESS_SHARE = 0.25
+
+
+def get_tasks() -> list[tuple[timedelta, timedelta]]:
+    """Returns run intervals and due times of tasks arriving faster than they are served, so a backlog builds up."""
+    randomizer = random.Random(42)
+    run_intervals = randomizer.choices(list(RUN_INTERVAL_SHARES), weights=list(RUN_INTERVAL_SHARES.values()), k=TASKS)
+    return sorted(
+        ((run_interval, ARRIVAL_PERIOD * randomizer.random()) for run_interval in run_intervals),
+        key=lambda task: task[1],
+    )
+
+
+def get_p95_lateness(prioritized: bool) -> dict[timedelta, timedelta]:
+    """Returns p95 lateness of tasks by run interval, served one at a time from a queue.
+
+    Tasks are published as soon as they are due. Like a RabbitMQ queue with `x-max-priority`, the queue serves
+    tasks with higher priority first and tasks with the same priority in publishing order.
+
+    """
+    tasks = get_tasks()
+    queue: list[tuple[int, int, timedelta, timedelta]] = []
+    lateness: dict[timedelta, list[float]] = {run_interval: [] for run_interval in RUN_INTERVAL_SHARES}
+    now = timedelta()
+    published = 0
+    while published < len(tasks) or queue:
+        if not queue and tasks[published][1] > now:
+            now = tasks[published][1]
+        while published < len(tasks) and tasks[published][1] <= now:
+            run_interval, due_at = tasks[published]
+            priority = get_scraping_task_priority(run_interval, now - due_at) if prioritized else 0
+            heapq.heappush(queue, (-priority, published, run_interval, due_at))
+            published += 1
+        _, _, run_interval, due_at = heapq.heappop(queue)
+        lateness[run_interval].append((now - due_at).total_seconds())
+        now += TASK_DURATION
+    return {
+        run_interval: timedelta(seconds=statistics.quantiles(values, n=20)[-1])
+        for run_interval, values in lateness.items()
+    }
+
+
+def test_priorities_serve_short_run_intervals_first() -> None:
+    fifo_lateness = get_p95_lateness(prioritized=False)
+    prioritized_lateness = get_p95_lateness(prioritized=True)
+
+    shortest_run_interval = min(RUN_INTERVAL_SHARES)
+    assert (
+        prioritized_lateness[shortest_run_interval]
+        <= fifo_lateness[shortest_run_interval] * MAX_PRIORITIZED_LATENESS_SHARE
+    )
+    assert prioritized_lateness[timedelta(hours=1)] < fifo_lateness[timedelta(hours=1)]
@@ -0,0 +1,62 @@
+import logging
+from collections import Counter, defaultdict
+from typing import Any
+
+import pytest
+
+from settings import TasksSettings
+from tasks.messages import ScrapingTask, TriggerTask
+from tasks.queues import get_trigger_scraping_tasks_queue
+from tasks.scheduler import MonitoringScheduler
+
+MONITORINGS = 20_000
+SHARD_COUNTS = [1, 2, 4, 8]
+
+
+class FakeBroker:
+    """Message broker stand-in recording published trigger tasks by their queue names."""
+
+    def __init__(self) -> None:
+        self.trigger_tasks: dict[str, list[TriggerTask]] = defaultdict(list)
+
+    async def publish(self, message: TriggerTask, **kwargs: Any) -> None:
+        self.trigger_tasks[kwargs["queue"].name].append(message)
+
+
+@pytest.mark.parametrize("shard_count", SHARD_COUNTS)
+async def test_scheduler_publishes_triggers_to_queues_of_their_shards(shard_count: int) -> None:
+    broker = FakeBroker()
+    scheduler = MonitoringScheduler(broker=broker, settings=TasksSettings(trigger_shards=shard_count))
+    await scheduler._publish(list(range(MONITORINGS)))
+
+    assert set(broker.trigger_tasks) == {get_trigger_scraping_tasks_queue(shard).name for shard in range(shard_count)}
+    for shard in range(shard_count):
+        (trigger_task,) = broker.trigger_tasks[get_trigger_scraping_tasks_queue(shard).name]
+        assert trigger_task.shard == shard
+        assert trigger_task.monitoring_ids == list(range(shard, MONITORINGS, shard_count))
+
+
+@pytest.mark.parametrize("shard_count", SHARD_COUNTS)
+async def test_shards_together_admit_up_to_marketplace_limits(
+    monkeypatch: pytest.MonkeyPatch, trigger_database: Any, shard_count: int
+) -> None:
+    from scrapers.crawlers import MARKETPLACE_PROFILES
+    from tasks.routers import trigger
+
+    monkeypatch.setattr(trigger.tasks_settings, "trigger_shards", shard_count)
+    monkeypatch.setattr(trigger, "marketplace_buckets", defaultdict(trigger.marketplace_buckets.default_factory))
+    published_runs: Counter[str] = Counter()
+
+    async def publish(scraping_task: ScrapingTask, **_kwargs: Any) -> None:
+        published_runs[scraping_task.marketplace_name] += len(scraping_task.subscriptions)
+
+    monkeypatch.setattr(trigger.scraping_task_publisher, "publish", publish)
+    for shard in range(shard_count):
+        await trigger.create_scraping_tasks(
+            list(range(shard, MONITORINGS, shard_count)), shard, logging.getLogger(__name__)
+        )
+
+    assert len(trigger_database.queries) == 2 * shard_count
+    for marketplace_name, profile in MARKETPLACE_PROFILES.items():
+        # Each shard's bucket holds its share of the limit, rounded down to whole runs.
+        assert profile.runs_per_minute - shard_count < published_runs[marketplace_name] <= profile.runs_per_minute
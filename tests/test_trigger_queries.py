@@ -0,0 +1,50 @@
+import logging
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+
+pytest.importorskip("fastcrawl")
+
+from sqlalchemy import Executable
+from sqlalchemy.dialects import postgresql
+
+from tasks.routers import trigger
+
+ASYNCPG_MAX_PARAMETERS = 32767
+DUE_MONITORINGS = [1_000, 10_000, 100_000]
+
+
+def count_parameters(query: Executable) -> int:
+    """Returns number of parameters the query is sent to PostgreSQL with."""
+    positiontup = query.compile(dialect=postgresql.asyncpg.dialect()).positiontup
+    assert positiontup is not None
+    return len(positiontup)
+
+
+def test_queue_runs_query_binds_constant_number_of_parameters() -> None:
+    now = datetime.now(UTC)
+    parameters = {
+        due_monitorings: count_parameters(
+            trigger.get_queue_runs_query(
+                list(range(0, due_monitorings, 2)),
+                {monitoring_id: now for monitoring_id in range(1, due_monitorings, 2)},
+                shard=0,
+            )
+        )
+        for due_monitorings in DUE_MONITORINGS
+    }
+    assert len(set(parameters.values())) == 1
+    assert parameters[max(DUE_MONITORINGS)] < ASYNCPG_MAX_PARAMETERS
+
+
+async def test_trigger_round_trips_dont_grow_with_due_monitorings(trigger_database: Any) -> None:
+    round_trips = {}
+    for due_monitorings in DUE_MONITORINGS:
+        trigger_database.queries.clear()
+        await trigger.create_scraping_tasks(list(range(due_monitorings)), 0, logging.getLogger(__name__))
+
+        round_trips[due_monitorings] = len(trigger_database.queries)
+        assert all(count_parameters(query) < ASYNCPG_MAX_PARAMETERS for query in trigger_database.queries)
+
+    assert len(set(round_trips.values())) == 1
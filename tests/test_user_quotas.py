@@ -0,0 +1,49 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("fastcrawl")
+
+from tasks.routers import trigger
+from tasks.routers.trigger import DueMonitoring
+
+RUN_INTERVAL = timedelta(minutes=5)
+
+
+def get_due_monitoring(user_crawl_seconds: float) -> DueMonitoring:
+    """Returns due monitoring of a user that has spent the crawl seconds within the budget window."""
+    return DueMonitoring(
+        id=1,
+        user_id=1,
+        url="https://example.com/catalog",
+        marketplace_name="Unlimited",
+        run_interval=RUN_INTERVAL,
+        next_run_at=datetime.now(UTC),
+        user_crawl_seconds=user_crawl_seconds,
+        user_runs=1 if user_crawl_seconds else 0,
+    )
+
+
+@pytest.mark.parametrize("user_crawl_seconds", [0, 600, 10_000])
+def test_zero_budget_disables_user_quota(monkeypatch: pytest.MonkeyPatch, user_crawl_seconds: float) -> None:
+    monkeypatch.setattr(trigger.tasks_settings, "user_crawl_seconds_per_hour", 0)
+    groups, deferred_monitorings = trigger.group_due_monitorings(
+        [get_due_monitoring(user_crawl_seconds)], datetime.now(UTC)
+    )
+    assert len(groups) == 1
+    assert not deferred_monitorings
+
+
+@pytest.mark.parametrize("user_crawl_seconds", [600, 601, 650])
+def test_users_at_or_just_over_budget_are_deferred_for_run_interval(
+    monkeypatch: pytest.MonkeyPatch, user_crawl_seconds: float
+) -> None:
+    monkeypatch.setattr(trigger.tasks_settings, "user_crawl_seconds_per_hour", 600)
+    now = datetime.now(UTC)
+    groups, deferred_monitorings = trigger.group_due_monitorings([get_due_monitoring(user_crawl_seconds)], now)
+    assert not groups
+    assert deferred_monitorings == {1: now + RUN_INTERVAL}
+
+
+def test_users_far_over_budget_are_deferred_until_budget_frees_up() -> None:
+    assert trigger.get_user_quota_delay(1200, 600, RUN_INTERVAL) == timedelta(minutes=30)